@@ -17,12 +17,16 @@ def clean_all_state():
     files_to_clean = [
         # Base de datos
         project_root / "data" / "pipeline.db",
+        # Archivos WAL: un -wal huérfano se aplicaría sobre una BD nueva con el mismo nombre
+        project_root / "data" / "pipeline.db-wal",
+        project_root / "data" / "pipeline.db-shm",
         project_root / "data" / "pipeline_development.db", 
         project_root / "data" / "pipeline_production.db",
         
         # Estadísticas persistidas
         project_root / "data" / "processed" / "pipeline_statistics.json",
         project_root / "data" / "processed" / "statistics_engine.json",
+        project_root / "data" / "processed" / "validation.done",
         
         # Logs
         project_root / "logs",
@@ -39,7 +39,9 @@ try:
         POSTGRES_CONFIG,
         TABLE_SCHEMAS,
         get_database_config,
-        get_connection_string
+        get_connection_string,
+        sqlite_mtime,
+        connect_sqlite_readonly
     )
 except ImportError:
     # Fallback values
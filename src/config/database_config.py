@@ -4,6 +4,7 @@ Configuración de base de datos
 """
 
 import os
+import sqlite3
 from typing import Dict, Any
 from pathlib import Path
 
@@ -123,4 +124,32 @@ def get_connection_string() -> str:
         )
         return connection_str
     else:
-        raise ValueError("Tipo de base de datos no soportado: {}".format(config["type"]))
\ No newline at end of file
+        raise ValueError("Tipo de base de datos no soportado: {}".format(config["type"]))
+
+def sqlite_mtime(db_path) -> float:
+    """
+    mtime de la BD SQLite incluyendo su -wal: en modo WAL las escrituras no tocan
+    el archivo principal hasta el checkpoint (clave de caché de las páginas de la UI)
+    """
+    mtime = Path(db_path).stat().st_mtime
+    try:
+        return max(mtime, Path(f"{db_path}-wal").stat().st_mtime)
+    except FileNotFoundError:
+        return mtime
+
+def connect_sqlite_readonly(db_path, cache_size_kib: int = 65536, mmap_size: int = 256 * 1024 * 1024,
+                            **connect_kwargs) -> sqlite3.Connection:
+    """
+    Conexión SQLite de solo lectura (URI mode=ro) compartible entre hilos, con caché de páginas,
+    mmap y temporales en RAM; connect_kwargs se pasan tal cual a sqlite3.connect
+    """
+    conn = sqlite3.connect(
+        f"{Path(db_path).resolve().as_uri()}?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        **connect_kwargs
+    )
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA cache_size=-{cache_size_kib}")
+    conn.execute(f"PRAGMA mmap_size={mmap_size}")
+    return conn
\ No newline at end of file
@@ -20,16 +20,18 @@ GOLD_PATH = MEDALLION_BASE_PATH / "gold"
 BRONZE_CONFIG = {
     "input_format": "csv",
     "output_format": "parquet",
-    "compression": "snappy",  # snappy, gzip, lz4, brotli
+    "compression": "zstd",  # snappy, gzip, lz4, brotli, zstd
+    "compression_level": 3,  # zstd 3: velocidad tipo snappy, ratio tipo gzip
     "row_group_size": 50000,
-    "page_size": 8192,
-    "use_dictionary": True,
+    "page_size": 1024 * 1024,  # Páginas de 1 MiB: cada frame zstd comprime bloques grandes
+    "use_dictionary": ["user_id", "source_file"],  # Solo columnas repetitivas; timestamp y price van planas
     "write_statistics": True,
     "preserve_index": False,
     "schema_validation": True,
     "add_metadata": True,  # Agregar metadatos de origen
     "partitioning": None,  
     "micro_batch_size": 1000,  # Filas por micro-batch 
+    "csv_block_size": 8 * 1024 * 1024,  # Bytes por bloque del lector CSV de Arrow
     "memory_optimization": True,  # Limpiar memoria entre batches
     "incremental_write": True,  # Escritura incremental de Parquet
     "progress_logging": 5  # Log progreso cada N batches
@@ -6,10 +6,10 @@ Parte de la arquitectura Medallion del pipeline de datos
 
 import os
 import logging
-import pandas as pd
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 import pyarrow as pa
+import pyarrow.csv as pacsv
 import pyarrow.parquet as pq
 from datetime import datetime
 import sys
@@ -53,18 +53,21 @@ class BronzeConverter:
             from config.medallion_config import BRONZE_CONFIG
             self.bronze_config = BRONZE_CONFIG
             self.micro_batch_size = BRONZE_CONFIG.get("micro_batch_size", 1000)
+            self.csv_block_size = BRONZE_CONFIG.get("csv_block_size", 8 * 1024 * 1024)
             logger.info(f"⚡ Micro-batch size: {self.micro_batch_size:,} filas")
         except ImportError:
             logger.warning("⚠️ No se pudo importar configuración medallion, usando valores por defecto")
             self.micro_batch_size = 1000
+            self.csv_block_size = 8 * 1024 * 1024
             self.bronze_config = {}
         
         # Configuración de Parquet
         self.parquet_config = {
-            "compression": self.bronze_config.get("compression", "snappy"),
+            "compression": self.bronze_config.get("compression", "zstd"),
+            "compression_level": self.bronze_config.get("compression_level", 3),
             "row_group_size": self.bronze_config.get("row_group_size", 50000),
-            "page_size": self.bronze_config.get("page_size", 8192),
-            "use_dictionary": self.bronze_config.get("use_dictionary", True),
+            "page_size": self.bronze_config.get("page_size", 1024 * 1024),
+            "use_dictionary": self.bronze_config.get("use_dictionary", ["user_id", "source_file"]),
             "write_statistics": self.bronze_config.get("write_statistics", True)
         }
     
@@ -118,12 +121,13 @@ class BronzeConverter:
         logger.info(f"📋 Archivos CSV encontrados: {[f.name for f in csv_files]}")
         return csv_files
     
-    def validate_csv_schema(self, df: pd.DataFrame, file_name: str) -> Dict[str, Any]:
+    def validate_csv_schema(self, batch: pa.RecordBatch, file_name: str) -> Dict[str, Any]:
         """
         Valida el esquema del CSV
         
         Args:
-            df: DataFrame a validar
+            batch: RecordBatch de Arrow a validar (price ya llega como float64:
+                   un precio no numérico hace fallar la lectura del CSV)
             file_name: Nombre del archivo para logs
             
         Returns:
@@ -133,29 +137,23 @@ class BronzeConverter:
             "valid": True,
             "warnings": [],
             "errors": [],
-            "row_count": len(df),
-            "column_count": len(df.columns)
+            "row_count": batch.num_rows,
+            "column_count": batch.num_columns
         }
         
         # Verificar columnas requeridas
         required_columns = ["timestamp", "price", "user_id"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in required_columns if col not in batch.schema.names]
         
         if missing_columns:
             validation_result["valid"] = False
             validation_result["errors"].append(f"Faltan columnas: {missing_columns}")
         
-        # Verificar tipos de datos
-        if "price" in df.columns:
-            non_numeric_prices = df[~pd.to_numeric(df["price"], errors="coerce").notna()]
-            if len(non_numeric_prices) > 0:
-                validation_result["warnings"].append(f"{len(non_numeric_prices)} precios no numéricos")
-        
         # Verificar valores nulos
-        null_counts = df.isnull().sum()
-        for col, null_count in null_counts.items():
+        for col, column in zip(batch.schema.names, batch.columns):
+            null_count = column.null_count
             if null_count > 0:
-                percentage = (null_count / len(df)) * 100
+                percentage = (null_count / batch.num_rows) * 100
                 validation_result["warnings"].append(f"{col}: {null_count} nulos ({percentage:.2f}%)")
         
         # Log resultados
@@ -205,39 +203,56 @@ class BronzeConverter:
             validation_passed = True
             
             # ✅ PROCESAMIENTO EN MICRO-BATCHES - NO CARGA TODO EN MEMORIA
-            csv_chunks = pd.read_csv(
+            # El lector de Arrow parsea bloques de csv_block_size bytes en C++ (sin pandas ni GIL)
+            # y cada bloque se corta en micro-batches de batch_size filas sin copiar datos
+            csv_reader = pacsv.open_csv(
                 csv_path,
-                chunksize=batch_size,
-                dtype={"user_id": "string"},
-                parse_dates=False
+                read_options=pacsv.ReadOptions(block_size=self.csv_block_size, use_threads=True),
+                convert_options=pacsv.ConvertOptions(
+                    column_types={"timestamp": pa.string(), "price": pa.float64(), "user_id": pa.string()},
+                    strings_can_be_null=True
+                )
+            )
+            csv_chunks = (
+                record_batch.slice(offset, batch_size)
+                for record_batch in csv_reader
+                for offset in range(0, record_batch.num_rows, batch_size)
             )
             
             # Crear writer de Parquet para escritura incremental
             parquet_writer = None
             
+            # Los micro-batches se acumulan como tablas Arrow hasta completar un row group:
+            # menos row groups = footer con menos estadísticas min/max que revisar
+            row_group_size = self.parquet_config["row_group_size"]
+            pending_tables = []
+            pending_rows = 0
+            
             try:
-                for chunk_df in csv_chunks:
+                for chunk in csv_chunks:
                     batch_count += 1
-                    batch_rows = len(chunk_df)
+                    batch_rows = chunk.num_rows
                     
                     logger.info(f"  📦 Procesando micro-batch {batch_count}: {batch_rows} filas")
                     
                     # Validar esquema solo en el primer batch
                     if first_batch:
-                        validation = self.validate_csv_schema(chunk_df, csv_path.name)
+                        validation = self.validate_csv_schema(chunk, csv_path.name)
                         if not validation["valid"]:
                             logger.error(f"❌ Esquema inválido en {csv_path.name}")
                             validation_passed = False
                             break
                         first_batch = False
                     
-                    # Agregar metadatos al chunk
-                    chunk_df["source_file"] = csv_path.name
-                    chunk_df["bronze_created_at"] = datetime.now().isoformat()
-                    chunk_df["bronze_created_by"] = "bronze_converter"
-                    
-                    # Convertir chunk a PyArrow Table
-                    table = pa.Table.from_pandas(chunk_df, schema=schema)
+                    # Columnas del CSV + metadatos de origen en una tabla con el esquema de Bronze
+                    table = pa.Table.from_arrays([
+                        chunk.column("timestamp"),
+                        chunk.column("price"),
+                        chunk.column("user_id"),
+                        pa.array([csv_path.name] * batch_rows, pa.string()),
+                        pa.array([datetime.now().isoformat()] * batch_rows, pa.string()),
+                        pa.array(["bronze_converter"] * batch_rows, pa.string())
+                    ], schema=schema)
                     
                     # Escribir de forma incremental
                     if parquet_writer is None:
@@ -246,12 +261,18 @@ class BronzeConverter:
                             parquet_path,
                             schema,
                             compression=self.parquet_config["compression"],
+                            compression_level=self.parquet_config["compression_level"],
+                            data_page_size=self.parquet_config["page_size"],
                             use_dictionary=self.parquet_config["use_dictionary"],
                             write_statistics=self.parquet_config["write_statistics"]
                         )
                     
-                    # Escribir tabla del batch
-                    parquet_writer.write_table(table)
+                    # Escribir el row group cuando se completa
+                    pending_tables.append(table)
+                    pending_rows += batch_rows
+                    if pending_rows >= row_group_size:
+                        parquet_writer.write_table(pa.concat_tables(pending_tables), row_group_size=row_group_size)
+                        pending_tables, pending_rows = [], 0
                     total_rows_processed += batch_rows
                     
                     # Log progreso cada 5 batches
@@ -259,7 +280,12 @@ class BronzeConverter:
                         logger.info(f"    📊 Progreso: {total_rows_processed:,} filas procesadas en {batch_count} batches")
                     
                     # ✅ IMPORTANTE: Limpiar memoria del chunk
-                    del chunk_df, table
+                    del chunk, table
+                
+                # Último row group incompleto
+                if pending_tables:
+                    parquet_writer.write_table(pa.concat_tables(pending_tables), row_group_size=row_group_size)
+                    del pending_tables
                 
             finally:
                 # Cerrar writer
@@ -297,13 +323,15 @@ class BronzeConverter:
         # Usar micro-batches de 1000 filas por defecto
         return self.convert_csv_to_parquet_microbatch(csv_path, batch_size=1000)
     
+    # Unidades de mayor a menor: se usa el primer umbral alcanzado, con una sola división
+    _SIZE_UNITS = (("TB", 1 << 40), ("GB", 1 << 30), ("MB", 1 << 20), ("KB", 1 << 10))
+    
     def format_size(self, size_bytes: int) -> str:
         """Formatea tamaño de archivo"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
+        for unit, unit_bytes in self._SIZE_UNITS:
+            if size_bytes >= unit_bytes:
+                return f"{size_bytes / unit_bytes:.1f} {unit}"
+        return f"{size_bytes:.1f} B"
     
     def get_parquet_info(self, parquet_path: Path) -> Dict[str, Any]:
         """
@@ -319,21 +347,30 @@ class BronzeConverter:
             # Leer metadatos sin cargar datos
             parquet_file = pq.ParquetFile(parquet_path)
             metadata = parquet_file.metadata
+            file_stat = parquet_path.stat()
             
             return {
                 "file_name": parquet_path.name,
-                "file_size": parquet_path.stat().st_size,
-                "file_size_formatted": self.format_size(parquet_path.stat().st_size),
+                "file_size": file_stat.st_size,
+                "file_size_formatted": self.format_size(file_stat.st_size),
                 "row_count": metadata.num_rows,
                 "column_count": len(parquet_file.schema),
                 "row_groups": metadata.num_row_groups,
                 "compression": str(metadata.row_group(0).column(0).compression),
                 "schema": [field.name for field in parquet_file.schema],
-                "created": datetime.fromtimestamp(parquet_path.stat().st_mtime).isoformat()
+                "created": datetime.fromtimestamp(file_stat.st_mtime).isoformat()
             }
         except Exception as e:
             return {"error": str(e)}
     
+    def _scan_file_sizes(self, folder: Path) -> Dict[str, int]:
+        """
+        Tamaños de los archivos de una carpeta en una sola pasada de os.scandir
+        (DirEntry reutiliza la información del listado del directorio)
+        """
+        with os.scandir(folder) as entries:
+            return {entry.path: entry.stat().st_size for entry in entries if entry.is_file()}
+    
     def convert_all_csv_to_bronze(self) -> Dict[str, Any]:
         """
         Convierte todos los archivos CSV a Parquet en la capa Bronze usando micro-batches
@@ -370,6 +407,11 @@ class BronzeConverter:
             }
         }
         
+        # Tamaños originales: un scandir por carpeta en lugar de un stat por CSV
+        csv_sizes = {}
+        for folder in {csv_path.parent for csv_path in csv_files}:
+            csv_sizes.update(self._scan_file_sizes(folder))
+        
         # ✅ PROCESAMIENTO SECUENCIAL - UN ARCHIVO A LA VEZ (no todos en memoria)
         for i, csv_path in enumerate(csv_files, 1):
             logger.info(f"\n📄 Procesando archivo {i}/{len(csv_files)}: {csv_path.name}")
@@ -386,7 +428,7 @@ class BronzeConverter:
                 
                 # Obtener información del archivo
                 parquet_info = self.get_parquet_info(parquet_path)
-                csv_size = csv_path.stat().st_size
+                csv_size = csv_sizes[str(csv_path)]
                 
                 # Calcular número de batches procesados
                 file_rows = parquet_info.get("row_count", 0)
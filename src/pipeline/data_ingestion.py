@@ -14,6 +14,7 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import json
+import math
 import sys
 
 # Configurar path para imports
@@ -73,6 +74,7 @@ class DataIngestionPipeline:
         
         # Configurar rutas
         self.bronze_path = self.project_root / "data" / "processed" / "bronze"
+        self.validation_checkpoint = self.project_root / "data" / "processed" / "validation.done"
         
         # Contadores y metadata
         self.files_processed = []
@@ -468,8 +470,34 @@ class DataIngestionPipeline:
         else:
             logger.error("❌ Verificación final fallida después de validation")
         
+        self._write_validation_checkpoint(validation_result)
+        
         return validation_result
     
+    def _write_validation_checkpoint(self, validation_result: Dict[str, Any]):
+        """
+        Escribe validation.done con el antes/después ya calculado
+        ✅ La UI lee este archivo pequeño en lugar de consultar la BD o el JSON completo
+        """
+        stat_keys = ('count', 'avg', 'min', 'max', 'sum')
+        
+        def _finite(value):
+            # min/max arrancan en ±inf: JSON estricto no los admite
+            return None if isinstance(value, float) and not math.isfinite(value) else value
+        
+        checkpoint = {
+            'processed_at': datetime.now().isoformat(),
+            'before': {key: _finite(validation_result['stats_before'].get(key)) for key in stat_keys},
+            'after': {key: _finite(validation_result['stats_after'].get(key)) for key in stat_keys},
+            'changes': validation_result['changes']
+        }
+        
+        try:
+            self.validation_checkpoint.write_text(json.dumps(checkpoint))
+            logger.info(f"💾 Checkpoint de validation escrito: {self.validation_checkpoint}")
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo escribir el checkpoint de validation: {e}")
+    
     def _print_pipeline_summary(self, pipeline_result: Dict[str, Any]):
         """
         Imprime resumen completo del pipeline
@@ -592,8 +620,16 @@ class DataIngestionPipeline:
 
 def main():
     """
-    Función principal para ejecutar el pipeline completo
+    Función principal para ejecutar el pipeline completo (o solo validation con --validation-only)
     """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Data Ingestion Pipeline")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Tamaño de micro-batch")
+    parser.add_argument("--validation-only", action="store_true", help="Procesar solo validation.parquet")
+    
+    args = parser.parse_args()
+    
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -605,10 +641,15 @@ def main():
     try:
         # Crear y ejecutar pipeline
         pipeline = DataIngestionPipeline(
-            batch_size=1000,  # Micro-batches de 1000 filas
+            batch_size=args.batch_size,
             enable_persistence=True
         )
         
+        if args.validation_only:
+            # Las estadísticas persistidas se cargan al crear el pipeline: validation continúa sobre ellas
+            result = pipeline.process_validation_file()
+            return 0 if result['success'] else 1
+        
         # Ejecutar pipeline completo
         result = pipeline.run_complete_pipeline()
         
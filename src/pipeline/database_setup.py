@@ -15,7 +15,7 @@ import uuid
 
 try:
     import sqlalchemy as sa
-    from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Float, DateTime, Text
+    from sqlalchemy import create_engine, event, MetaData, Table, Column, Integer, String, Float, DateTime, Text, Index
     from sqlalchemy.orm import sessionmaker
     from sqlalchemy.exc import SQLAlchemyError
     SQLALCHEMY_AVAILABLE = True
@@ -25,6 +25,72 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# WAL: los dashboards leen (mode=ro) mientras el pipeline escribe, sin bloquearse entre sí.
+# journal_mode queda guardado en el archivo; synchronous es por conexión (NORMAL basta con WAL)
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """Aplica _SQLITE_PRAGMAS a una conexión sqlite3 (también como listener 'connect' de SQLAlchemy)"""
+    cursor = dbapi_connection.cursor()
+    for pragma in _SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+# Agregados de transactions mantenidos por triggers: la UI lee una fila en lugar de escanear la tabla.
+# MIN/MAX solo se recalculan (vía idx_price) cuando se borra/actualiza el extremo vigente.
+_AGGREGATE_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS transactions_agg (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        count INTEGER NOT NULL,
+        sum REAL,
+        min REAL,
+        max REAL
+    )
+    """,
+    """
+    INSERT INTO transactions_agg (id, count, sum, min, max)
+    SELECT 1, COUNT(*), SUM(price), MIN(price), MAX(price) FROM transactions
+    WHERE NOT EXISTS (SELECT 1 FROM transactions_agg)
+    HAVING NOT EXISTS (SELECT 1 FROM transactions_agg)
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_agg_insert AFTER INSERT ON transactions
+    BEGIN
+        UPDATE transactions_agg SET
+            count = count + 1,
+            sum = COALESCE(sum, 0) + NEW.price,
+            min = CASE WHEN min IS NULL OR NEW.price < min THEN NEW.price ELSE min END,
+            max = CASE WHEN max IS NULL OR NEW.price > max THEN NEW.price ELSE max END
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_agg_delete AFTER DELETE ON transactions
+    BEGIN
+        UPDATE transactions_agg SET
+            count = count - 1,
+            sum = sum - OLD.price,
+            min = CASE WHEN OLD.price <= min THEN (SELECT MIN(price) FROM transactions) ELSE min END,
+            max = CASE WHEN OLD.price >= max THEN (SELECT MAX(price) FROM transactions) ELSE max END
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_agg_update AFTER UPDATE OF price ON transactions
+    BEGIN
+        UPDATE transactions_agg SET
+            sum = sum - OLD.price + NEW.price,
+            min = (SELECT MIN(price) FROM transactions),
+            max = (SELECT MAX(price) FROM transactions)
+        WHERE id = 1;
+    END
+    """
+)
+
 class DatabaseManager:
     """
     Maneja la base de datos para el pipeline de datos.
@@ -88,6 +154,10 @@ class DatabaseManager:
             Column('processing_metadata', Text, nullable=True)
         )
         
+        # Índice cubridor para lecturas ordenadas por timestamp filtradas por precio/usuario
+        Index('idx_tx_ts_price_user', self.transactions_table.c.timestamp,
+              self.transactions_table.c.price, self.transactions_table.c.user_id)
+        
         # Tabla de metadatos de batches
         self.batch_metadata_table = Table(
             'batch_metadata',
@@ -137,6 +207,9 @@ class DatabaseManager:
             else:
                 self._create_tables_native_sqlite()
             
+            if self.config['type'] == 'sqlite':
+                self._create_aggregate_table()
+            
             logger.info("✅ Conexión a BD establecida y tablas verificadas")
             
         except Exception as e:
@@ -154,12 +227,15 @@ class DatabaseManager:
                 connection_string,
                 echo=self.config.get('echo', False)
             )
+            # Cada conexión del pool recibe los PRAGMAs al abrirse
+            event.listen(self.engine, "connect", _apply_sqlite_pragmas)
             self.session_maker = sessionmaker(bind=self.engine)
             self.use_sqlalchemy = True
             logger.info("✅ Usando SQLAlchemy para SQLite")
         else:
             # ✅ FALLBACK a SQLite nativo
             self.sqlite_connection = sqlite3.connect(self.config['path'])
+            _apply_sqlite_pragmas(self.sqlite_connection)
             self.use_sqlalchemy = False
             logger.info("✅ Usando SQLite nativo")
     
@@ -211,6 +287,7 @@ class DatabaseManager:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_id ON transactions(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_source_file ON transactions(source_file)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_batch_id ON transactions(batch_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tx_ts_price_user ON transactions(timestamp, price, user_id)')
         
         # Tabla de metadatos de batches
         cursor.execute('''
@@ -244,6 +321,23 @@ class DatabaseManager:
         self.sqlite_connection.commit()  # ✅ USAR sqlite_connection correctamente
         logger.info("✅ Tablas SQLite nativas creadas/verificadas")
     
+    def _create_aggregate_table(self):
+        """
+        Crea transactions_agg y sus triggers (SQLite); la siembra desde los datos existentes
+        va en la misma transacción para no perder filas
+        """
+        if self.use_sqlalchemy:
+            with self.engine.begin() as conn:
+                for statement in _AGGREGATE_DDL:
+                    conn.execute(sa.text(statement))
+        else:
+            cursor = self.sqlite_connection.cursor()
+            for statement in _AGGREGATE_DDL:
+                cursor.execute(statement)
+            self.sqlite_connection.commit()
+        
+        logger.info("✅ Tabla de agregados y triggers verificados")
+    
     def insert_batch(self, batch_data: pd.DataFrame, batch_info: Dict[str, Any]) -> str:
         """
         Inserta un micro-batch en la base de datos
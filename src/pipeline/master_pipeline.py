@@ -435,6 +435,7 @@ class MasterPipeline:
             "=" * 50,
             "",
             f"📅 Fecha de ejecución: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"⏱️ Duración: {(datetime.now() - self.execution_start).total_seconds():.2f} segundos" if self.execution_start else "⏱️ Duración: n/a",
             f"⚡ Batch size utilizado: {self.batch_size:,}",
             f"📊 Estadísticas incrementales: {'Habilitadas' if self.enable_stats else 'Deshabilitadas'}",
             "",
@@ -326,10 +326,14 @@ def get_last_report_date():
     try:
         logs_path = PROJECT_ROOT / "logs"
         if logs_path.exists():
-            reports = list(logs_path.glob("daily_report_*.txt"))
-            if reports:
-                latest = max(reports, key=lambda x: x.stat().st_mtime)
-                date_str = latest.stem.replace("daily_report_", "")
+            # El nombre lleva la fecha (daily_report_YYYY-MM-DD): orden lexicográfico = cronológico, sin stat()
+            latest_name = max(
+                (e.name for e in os.scandir(logs_path)
+                 if e.name.startswith("daily_report_") and e.name.endswith(".txt")),
+                default=None
+            )
+            if latest_name:
+                date_str = latest_name[len("daily_report_"):-len(".txt")]
                 return date_str
         return None
     except:
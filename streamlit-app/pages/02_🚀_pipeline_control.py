@@ -9,19 +9,32 @@ import streamlit as st
 import sys
 from pathlib import Path
 import subprocess
-import threading
-import time
 import json
 from datetime import datetime
-import queue
 import os
-import pandas as pd
+import re
+import io
+import logging
+import sqlite3
+import threading
 
 # Configurar paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 SRC_PATH = PROJECT_ROOT / "src"
 sys.path.insert(0, str(SRC_PATH))
 
+# Constantes del pipeline (se evalúan una sola vez al importar la página)
+_EXPECTED_BRONZE = 6  # 2012-1..2012-5 + validation
+_PROGRESS_STEPS = ("Descarga", "Bronze", "Pipeline", "Validation", "Reporte")
+_STATS_SQL = "SELECT COUNT(*), AVG(price), MIN(price), MAX(price), SUM(price) FROM transactions"
+_REPORT_FIELDS_RE = re.compile(
+    r"(Fecha de ejecución|Duración|Archivos Bronze generados|Registros en base de datos):\s*(.+)"
+)
+
+def _connect_readonly(db_path):
+    """Abre la BD en modo solo lectura (sin journal ni bloqueo de escritura)"""
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+
 st.set_page_config(page_title="Control Pipeline", page_icon="🚀", layout="wide")
 
 def main():
@@ -146,49 +159,15 @@ def main():
     with col2:
         st.markdown("### 📊 Estado Actual")
         
-        # ✅ CONTENEDOR QUE SE ACTUALIZA EN TIEMPO REAL
-        metrics_container = st.empty()
-        
-        # Actualizar métricas
-        with metrics_container.container():
-            display_pipeline_metrics()
+        # ✅ FRAGMENTO QUE SE ACTUALIZA EN TIEMPO REAL (independiente del resto de la página)
+        display_pipeline_metrics()
         
         st.markdown("---")
         
         # ✅ PROGRESO CON ACTUALIZACIÓN AUTOMÁTICA
         st.markdown("### 📈 Progreso del Pipeline")
         
-        progress_container = st.empty()
-        
-        with progress_container.container():
-            progress_data = get_pipeline_progress()
-            
-            for step_name, progress in progress_data.items():
-                col_label, col_progress = st.columns([1, 2])
-                
-                with col_label:
-                    # Emoji dinámico basado en progreso
-                    if progress == 100:
-                        emoji = "✅"
-                        status = "Completado"
-                        delta_color = "normal"
-                    elif progress > 0:
-                        emoji = "🔄"
-                        status = "En progreso"
-                        delta_color = "inverse"
-                    else:
-                        emoji = "⏸️"
-                        status = "Pendiente"
-                        delta_color = "off"
-                    
-                    st.metric(
-                        label=f"{emoji} {step_name}",
-                        value=f"{progress}%",
-                        delta=status
-                    )
-                
-                with col_progress:
-                    st.progress(progress / 100)
+        _progress_fragment()
         
         st.markdown("---")
         
@@ -286,6 +265,10 @@ def main():
                         f"${validation_comparison['min_after']:.2f} - ${validation_comparison['max_after']:.2f}",
                         delta="Actualizado"
                     )
+        
+        st.markdown("---")
+        
+        display_last_execution()
 
 def check_reto_requirements():
     """Verifica cumplimiento de requerimientos del reto"""
@@ -298,7 +281,7 @@ def check_reto_requirements():
         if raw_path.exists():
             for path in [raw_path] + list(raw_path.glob("*/")):
                 if path.is_dir():
-                    csv_count += len(list(path.glob("*.csv")))
+                    csv_count += sum(1 for _ in path.glob("*.csv"))
         
         status["1. Descarga de datos"] = {
             "completed": csv_count >= 5,
@@ -307,19 +290,18 @@ def check_reto_requirements():
         
         # 2. Procesamiento sin cargar todo en memoria
         bronze_path = PROJECT_ROOT / "data" / "processed" / "bronze"
-        bronze_files = len(list(bronze_path.glob("*.parquet"))) if bronze_path.exists() else 0
+        bronze_files = sum(1 for _ in bronze_path.glob("*.parquet")) if bronze_path.exists() else 0
         
         status["2. Conversión Bronze (micro-batches)"] = {
             "completed": bronze_files >= 5,
-            "message": f"{bronze_files}/6 archivos convertidos"
+            "message": f"{bronze_files}/{_EXPECTED_BRONZE} archivos convertidos"
         }
         
         # 3. Almacenamiento en BD
         db_path = PROJECT_ROOT / "data" / "pipeline.db"
         db_records = 0
         if db_path.exists():
-            import sqlite3
-            conn = sqlite3.connect(str(db_path))
+            conn = _connect_readonly(db_path)
             cursor = conn.execute("SELECT COUNT(*) FROM transactions")
             db_records = cursor.fetchone()[0]
             conn.close()
@@ -403,30 +385,63 @@ def get_validation_comparison():
         return None
     except:
         return None
-        
-        # ✅ ÚLTIMA EJECUCIÓN CON MÁS DETALLES
-        st.markdown("### 🕐 Última Ejecución")
-        last_execution = get_last_execution_info()
-        
-        if last_execution:
-            st.success(f"**📅 Fecha**: {last_execution['date']}")
-            st.info(f"**⏱️ Duración**: {last_execution['duration']}")
-            st.info(f"**📄 Archivos**: {last_execution['files']}")
-            st.info(f"**📊 Filas**: {last_execution['rows']}")
-            
-            # Mostrar diferencias antes/después si están disponibles
-            if 'before_validation' in last_execution and 'after_validation' in last_execution:
-                st.markdown("#### 🧪 Cambios por Validation:")
-                before = last_execution['before_validation']
-                after = last_execution['after_validation']
-                
-                change_count = after.get('count', 0) - before.get('count', 0)
-                change_avg = after.get('avg', 0) - before.get('avg', 0)
+
+@st.fragment
+def display_last_execution():
+    """Muestra la información de la última ejecución del pipeline"""
+    # ✅ ÚLTIMA EJECUCIÓN CON MÁS DETALLES
+    st.markdown("### 🕐 Última Ejecución")
+    last_execution = get_last_execution_info()
+    
+    if last_execution:
+        st.success(f"**📅 Fecha**: {last_execution['date']}")
+        st.info(f"**⏱️ Duración**: {last_execution['duration']}")
+        st.info(f"**📄 Archivos**: {last_execution['files']}")
+        st.info(f"**📊 Filas**: {last_execution['rows']}")
+    else:
+        st.warning("Sin ejecuciones previas")
+
+def _stream_subprocess(cmd, env, timeout, log_placeholder=None):
+    """Ejecuta cmd leyendo stdout+stderr línea a línea (sin bufferizar todo hasta el final)"""
+    if 'pipeline_logs' not in st.session_state:
+        st.session_state.pipeline_logs = []
+    
+    output_lines = []
+    env = {**env, "PYTHONUNBUFFERED": "1"}  # el hijo no debe retener su stdout en buffer
+    timed_out = threading.Event()
+    
+    with subprocess.Popen(
+        cmd, cwd=str(PROJECT_ROOT), env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
+    ) as proc:
+        def _on_timeout():
+            timed_out.set()
+            proc.kill()
+        
+        # Watchdog independiente de la salida: mata al hijo aunque se cuelgue sin imprimir
+        watchdog = threading.Timer(timeout, _on_timeout)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            for line in proc.stdout:
+                line = line.rstrip('\n')
+                output_lines.append(line)
+                st.session_state.pipeline_logs.append(line)
                 
-                st.metric("Filas añadidas", f"+{change_count:,}")
-                st.metric("Cambio en promedio", f"${change_avg:+.2f}")
-        else:
-            st.warning("Sin ejecuciones previas")
+                if log_placeholder is not None:
+                    log_placeholder.code("\n".join(output_lines[-15:]), language="bash")
+            
+            returncode = proc.wait()
+        finally:
+            watchdog.cancel()
+            # Nunca salir del with con el hijo vivo: __exit__ esperaría sin límite
+            if proc.poll() is None:
+                proc.kill()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout, output="\n".join(output_lines))
+    
+    return subprocess.CompletedProcess(cmd, returncode, stdout="\n".join(output_lines), stderr="")
 
 def execute_full_pipeline(batch_size, enable_stats, enable_verification):
     """Ejecuta el pipeline completo - ✅ SYNTAX FIXED"""
@@ -464,30 +479,12 @@ def execute_full_pipeline(batch_size, enable_stats, enable_verification):
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            steps = [
-                "📥 Descarga de datos",
-                "🥉 Conversión Bronze", 
-                "🗄️ Ingesta a BD",
-                "🧪 Validation",
-                "📊 Reportes"
-            ]
-            
-            for i, step in enumerate(steps):
-                progress_bar.progress((i + 1) * 20)
-                status_text.text(f"Ejecutando: {step}...")
-                st.session_state.pipeline_logs.append(f"🔄 {step}...")
-                time.sleep(0.5)
+            status_text.text("Ejecutando pipeline maestro...")
+            log_placeholder = st.empty()
             
-            # Ejecutar pipeline
+            # Ejecutar pipeline (la salida se muestra a medida que llega)
             try:
-                result = subprocess.run(
-                    cmd,
-                    cwd=str(PROJECT_ROOT),
-                    capture_output=True,
-                    text=True,
-                    env=env,
-                    timeout=600
-                )
+                result = _stream_subprocess(cmd, env, timeout=600, log_placeholder=log_placeholder)
                 
                 st.session_state.pipeline_result = result
                 st.session_state.pipeline_running = False
@@ -532,11 +529,10 @@ def execute_full_pipeline(batch_size, enable_stats, enable_verification):
                     status_text.text("❌ Error en ejecución")
                     st.error("❌ Error ejecutando pipeline maestro")
                     
-                    if result.stderr:
-                        st.markdown("### ❌ Detalles del Error:")
-                        st.code(result.stderr, language="bash")
-                    
                     if result.stdout:
+                        st.markdown("### ❌ Detalles del Error:")
+                        st.code(result.stdout[-3000:], language="bash")
+                        
                         with st.expander("📄 Ver output completo"):
                             st.text(result.stdout)
                 
@@ -572,7 +568,8 @@ def execute_download_and_bronze():
             env = os.environ.copy()
             env["PYTHONPATH"] = str(SRC_PATH)
             
-            result_download = subprocess.run(cmd_download, cwd=str(PROJECT_ROOT), capture_output=True, text=True, env=env, timeout=180)
+            log_placeholder = st.empty()
+            result_download = _stream_subprocess(cmd_download, env, timeout=180, log_placeholder=log_placeholder)
             
             if result_download.returncode == 0:
                 st.success("✅ Descarga completada")
@@ -584,7 +581,7 @@ def execute_download_and_bronze():
                     str(PROJECT_ROOT / "src" / "data_flow" / "bronze_converter.py")
                 ]
                 
-                result_bronze = subprocess.run(cmd_bronze, cwd=str(PROJECT_ROOT), capture_output=True, text=True, env=env, timeout=180)
+                result_bronze = _stream_subprocess(cmd_bronze, env, timeout=180, log_placeholder=log_placeholder)
                 
                 if result_bronze.returncode == 0:
                     st.success("✅ Conversión Bronze completada")
@@ -597,10 +594,10 @@ def execute_download_and_bronze():
                         st.text(result_bronze.stdout[-500:] if result_bronze.stdout else "Sin output")
                 else:
                     st.error("❌ Error en conversión Bronze")
-                    st.code(result_bronze.stderr, language="bash")
+                    st.code(result_bronze.stdout[-3000:], language="bash")
             else:
                 st.error("❌ Error en descarga")
-                st.code(result_download.stderr, language="bash")
+                st.code(result_download.stdout[-3000:], language="bash")
         
         except subprocess.TimeoutExpired:
             st.warning("⏰ Proceso tomó más tiempo del esperado")
@@ -608,26 +605,37 @@ def execute_download_and_bronze():
             st.error(f"❌ Error: {str(e)}")
 
 def execute_bronze_only():
-    """Ejecuta solo la conversión Bronze - ✅ UPDATED"""
+    """Ejecuta solo la conversión Bronze en el mismo proceso (sin lanzar un intérprete nuevo)"""
     with st.spinner("Ejecutando conversión Bronze..."):
         try:
-            cmd = [
-                "python3",
-                str(PROJECT_ROOT / "src" / "data_flow" / "bronze_converter.py")
-            ]
+            # Import diferido: pandas/pyarrow del convertidor no se cargan al arrancar la página
+            from data_flow.bronze_converter import main as run_bronze
             
-            env = os.environ.copy()
-            env["PYTHONPATH"] = str(SRC_PATH)
+            # El convertidor informa vía logging: se captura solo su logger (no el root ni sys.stdout,
+            # que comparten las demás sesiones del servidor) con nivel explícito
+            output = io.StringIO()
+            handler = logging.StreamHandler(output)
+            handler.setLevel(logging.INFO)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            converter_logger = logging.getLogger(run_bronze.__module__)
+            previous_level = converter_logger.level
+            converter_logger.setLevel(logging.INFO)
+            converter_logger.addHandler(handler)
+            try:
+                exit_code = run_bronze()
+            finally:
+                converter_logger.removeHandler(handler)
+                converter_logger.setLevel(previous_level)
             
-            result = subprocess.run(cmd, cwd=str(PROJECT_ROOT), capture_output=True, text=True, env=env, timeout=180)
+            log_text = output.getvalue()
             
-            if result.returncode == 0:
+            if exit_code == 0:
                 st.success("✅ Conversión Bronze completada")
                 
                 # ✅ MOSTRAR INFORMACIÓN ÚTIL
-                if result.stdout:
+                if log_text:
                     # Extraer líneas importantes
-                    lines = result.stdout.split('\n')
+                    lines = log_text.split('\n')
                     important_lines = [line for line in lines if any(keyword in line for keyword in ['✅', 'procesado', 'archivos', 'filas', '🎉'])]
                     
                     if important_lines:
@@ -636,14 +644,12 @@ def execute_bronze_only():
                             st.text(line)
                     
                     with st.expander("📄 Ver log completo"):
-                        st.text(result.stdout)
+                        st.text(log_text)
             else:
                 st.error("❌ Error en conversión Bronze")
-                if result.stderr:
-                    st.code(result.stderr, language="bash")
+                if log_text:
+                    st.code(log_text, language="bash")
         
-        except subprocess.TimeoutExpired:
-            st.warning("⏰ Conversión Bronze tomó más tiempo del esperado")
         except Exception as e:
             st.error(f"❌ Error: {str(e)}")
 
@@ -669,6 +675,9 @@ def clean_all_data():
                 if db_path.exists():
                     db_path.unlink()
                     deleted_items.append("🗄️ Base de datos")
+                # Archivos WAL de la BD (un -wal huérfano se aplicaría sobre la próxima BD)
+                for suffix in ("-wal", "-shm"):
+                    Path(f"{db_path}{suffix}").unlink(missing_ok=True)
                 
                 # Eliminar archivos Bronze
                 bronze_path = PROJECT_ROOT / "data" / "processed" / "bronze"
@@ -685,6 +694,9 @@ def clean_all_data():
                     stats_path.unlink()
                     deleted_items.append("📊 Estadísticas")
                 
+                # Eliminar checkpoint de validation
+                (PROJECT_ROOT / "data" / "processed" / "validation.done").unlink(missing_ok=True)
+                
                 # Eliminar reportes recientes
                 logs_path = PROJECT_ROOT / "logs"
                 if logs_path.exists():
@@ -710,40 +722,50 @@ def clean_all_data():
         if st.button("❌ Cancelar", use_container_width=True):
             st.info("Operación cancelada")
 
-def clean_database():
-    """Limpia solo la base de datos"""
-    if st.button("⚠️ Confirmar limpieza de BD", type="secondary"):
-        try:
-            db_path = PROJECT_ROOT / "data" / "pipeline.db"
-            if db_path.exists():
-                db_path.unlink()
-                st.success("✅ Base de datos limpiada")
-                
-                # Limpiar estadísticas también
-                stats_path = PROJECT_ROOT / "data" / "processed" / "pipeline_statistics.json"
-                if stats_path.exists():
-                    stats_path.unlink()
-                    st.info("🧹 Archivo de estadísticas también eliminado")
+@st.fragment(run_every=10)
+def _progress_fragment():
+    """Renderiza el progreso del pipeline; se refresca con su propio temporizador"""
+    progress_data = get_pipeline_progress()
+    
+    for step_name, progress in progress_data.items():
+        col_label, col_progress = st.columns([1, 2])
+        
+        with col_label:
+            # Emoji dinámico basado en progreso
+            if progress == 100:
+                emoji = "✅"
+                status = "Completado"
+            elif progress > 0:
+                emoji = "🔄"
+                status = "En progreso"
             else:
-                st.warning("⚠️ Base de datos no existe")
-        except Exception as e:
-            st.error(f"❌ Error: {str(e)}")
+                emoji = "⏸️"
+                status = "Pendiente"
+            
+            st.metric(
+                label=f"{emoji} {step_name}",
+                value=f"{progress}%",
+                delta=status
+            )
+        
+        with col_progress:
+            st.progress(progress / 100)
 
+@st.fragment(run_every=10)
 def display_pipeline_metrics():
     """Muestra métricas del pipeline - ✅ FIXED"""
     try:
         # Bronze files
         bronze_path = PROJECT_ROOT / "data" / "processed" / "bronze"
-        bronze_count = len(list(bronze_path.glob("*.parquet"))) if bronze_path.exists() else 0
+        bronze_count = sum(1 for _ in bronze_path.glob("*.parquet")) if bronze_path.exists() else 0
         
         st.metric("🥉 Archivos Bronze", bronze_count)
         
         # Database records
         try:
-            import sqlite3
             db_path = PROJECT_ROOT / "data" / "pipeline.db"
             if db_path.exists():
-                conn = sqlite3.connect(str(db_path))
+                conn = _connect_readonly(db_path)
                 cursor = conn.execute("SELECT COUNT(*) FROM transactions")
                 db_count = cursor.fetchone()[0]
                 conn.close()
@@ -778,17 +800,8 @@ def _get_local_statistics_data():
         # Fallback: calcular desde BD si existe
         db_path = PROJECT_ROOT / "data" / "pipeline.db"
         if db_path.exists():
-            import sqlite3
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.execute("""
-                SELECT 
-                    COUNT(*) as count,
-                    AVG(price) as avg,
-                    MIN(price) as min,
-                    MAX(price) as max,
-                    SUM(price) as sum
-                FROM transactions
-            """)
+            conn = _connect_readonly(db_path)
+            cursor = conn.execute(_STATS_SQL)
             result = cursor.fetchone()
             conn.close()
             
@@ -812,8 +825,8 @@ def get_pipeline_progress():
     try:
         # Verificar archivos Bronze
         bronze_path = PROJECT_ROOT / "data" / "processed" / "bronze"
-        bronze_files = len(list(bronze_path.glob("*.parquet"))) if bronze_path.exists() else 0
-        bronze_progress = min(100, (bronze_files / 6) * 100)  # 6 archivos esperados
+        bronze_files = sum(1 for _ in bronze_path.glob("*.parquet")) if bronze_path.exists() else 0
+        bronze_progress = min(100, bronze_files * 100 // _EXPECTED_BRONZE)
         
         # Verificar BD
         db_path = PROJECT_ROOT / "data" / "pipeline.db"
@@ -823,43 +836,48 @@ def get_pipeline_progress():
         stats_path = PROJECT_ROOT / "data" / "processed" / "pipeline_statistics.json"
         stats_progress = 100 if stats_path.exists() else 0
         
-        progress = {
-            "Descarga": 100 if bronze_files > 0 else 0,
-            "Bronze": int(bronze_progress),
-            "Pipeline": int(db_progress),
-            "Validation": int(stats_progress),
-            "Reporte": int(min(db_progress, stats_progress))
-        }
-        
-        return progress
+        # Aritmética entera: no hace falta ningún int(...)
+        values = (
+            100 if bronze_files > 0 else 0,
+            bronze_progress,
+            db_progress,
+            stats_progress,
+            min(db_progress, stats_progress)
+        )
+        return dict(zip(_PROGRESS_STEPS, values))
     
     except Exception:
         # ✅ FALLBACK SEGURO
-        return {
-            "Descarga": 0,
-            "Bronze": 0,
-            "Pipeline": 0,
-            "Validation": 0,
-            "Reporte": 0
-        }
+        return dict.fromkeys(_PROGRESS_STEPS, 0)
+
+@st.cache_data(show_spinner=False)
+def _parse_execution_report(report_path, mtime):
+    """Parsea un reporte de ejecución en una sola pasada (cacheado por ruta + mtime)"""
+    with open(report_path, 'r') as f:
+        fields = dict(_REPORT_FIELDS_RE.findall(f.read()))
+    
+    # ✅ DATOS SEGUROS (solo strings) - "n/a" para lo que el reporte no incluya
+    return {
+        "date": fields.get("Fecha de ejecución", Path(report_path).stem.replace("pipeline_report_", "")),
+        "duration": fields.get("Duración", "n/a"),
+        "files": fields.get("Archivos Bronze generados", "n/a"),
+        "rows": fields.get("Registros en base de datos", "n/a")
+    }
 
 def get_last_execution_info():
     """Obtiene información de la última ejecución - ✅ SAFE"""
     try:
         logs_path = PROJECT_ROOT / "logs"
         if logs_path.exists():
-            reports = list(logs_path.glob("daily_report_*.txt"))
-            if reports:
-                latest = max(reports, key=lambda x: x.stat().st_mtime)
-                date_str = latest.stem.replace("daily_report_", "")
-                
-                # ✅ DATOS SEGUROS (solo strings)
-                return {
-                    "date": date_str,
-                    "duration": "~1 min",
-                    "files": "6",
-                    "rows": "~150"
-                }
+            # pipeline_report_YYYYMMDD_HHMMSS: el nombre ya ordena cronológicamente, solo se hace stat() del último
+            latest_name = max(
+                (e.name for e in os.scandir(logs_path)
+                 if e.name.startswith("pipeline_report_") and e.name.endswith(".txt")),
+                default=None
+            )
+            if latest_name:
+                latest = logs_path / latest_name
+                return _parse_execution_report(str(latest), latest.stat().st_mtime)
         
         return None
     except Exception:
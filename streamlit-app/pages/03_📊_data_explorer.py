@@ -10,15 +10,61 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pyarrow.csv as pacsv
 from pathlib import Path
+from dataclasses import dataclass
 import sys
-import sqlite3
+import os
+
+try:
+    import connectorx as cx
+    CONNECTORX_AVAILABLE = True
+except ImportError:
+    CONNECTORX_AVAILABLE = False
 
 # Configurar paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 SRC_PATH = PROJECT_ROOT / "src"
 sys.path.insert(0, str(SRC_PATH))
 
+from config.database_config import sqlite_mtime, connect_sqlite_readonly
+
+_EXPLORER_COLUMNS = ('timestamp', 'price', 'user_id')
+_MAX_ROWS = 5000  # Limitar para performance
+# Hash por contenido (sin índice) para las funciones cacheadas que reciben DataFrames
+_DF_HASH = {pd.DataFrame: lambda d: pd.util.hash_pandas_object(d, index=False).values.tobytes()}
+_TARGET_POINTS = 1000  # puntos máximos enviados a Plotly en la serie temporal
+_RESAMPLE_FREQS = ('1min', '5min', '1h', '1D')
+# Día ISO (YYYY-MM-DD) del timestamp, que la BD guarda como texto m/d/Y: comparable con BETWEEN
+_ISO_DAY_SQL = (
+    "CASE WHEN instr(timestamp, '/') = 0 THEN substr(timestamp, 1, 10) ELSE printf('%04d-%02d-%02d', "
+    "CAST(substr(substr(timestamp, instr(timestamp, '/') + 1), "
+    "instr(substr(timestamp, instr(timestamp, '/') + 1), '/') + 1, 4) AS INTEGER), "
+    "CAST(timestamp AS INTEGER), CAST(substr(timestamp, instr(timestamp, '/') + 1) AS INTEGER)) END"
+)
+# El rango de fechas se aplica antes del LIMIT: la muestra sale del rango pedido
+_TRANSACTIONS_SQL = (
+    "SELECT timestamp, price, user_id FROM transactions "
+    "WHERE price BETWEEN ? AND ? AND (? = '' OR user_id = ?) "
+    f"AND (? = '' OR {_ISO_DAY_SQL} BETWEEN ? AND ?) "
+    "ORDER BY timestamp LIMIT ?"
+)
+
+@dataclass(frozen=True, slots=True)
+class LoadSpec:
+    """Parámetros de carga elegidos en el sidebar"""
+    source: str
+    min_price: int = 0
+    max_price: int = 200
+    user: str = ""
+    date_range: tuple = ()
+    file: str = ""
+    sample_size: int = 1000
+
 st.set_page_config(page_title="Explorador de Datos", page_icon="📊", layout="wide")
 
 def main():
@@ -39,26 +85,38 @@ def main():
         # Filtros
         st.markdown("### 🔍 Filtros")
         
+        # Solo primitivas: el spec es hashable y no arrastra widgets
+        spec_kwargs = {"source": data_source}
+        
         if data_source == "Base de Datos":
             # Filtros para BD
             date_range = st.date_input("Rango de fechas", value=[], help="Filtrar por rango de fechas")
             price_range = st.slider("Rango de precios", 0, 200, (0, 200))
             user_filter = st.text_input("Usuario específico", placeholder="ej: user_1")
+            spec_kwargs.update(
+                min_price=int(price_range[0]),
+                max_price=int(price_range[1]),
+                user=user_filter.strip(),
+                date_range=tuple(date_range)
+            )
             
         elif data_source == "Archivos Bronze":
             # Selector de archivo Bronze
             bronze_files = get_bronze_files()
             selected_file = st.selectbox("Archivo Parquet", bronze_files)
+            spec_kwargs["file"] = selected_file or ""
             
         else:
             # Selector de archivo CSV
             csv_files = get_csv_files()
             selected_csv = st.selectbox("Archivo CSV", csv_files)
+            spec_kwargs["file"] = selected_csv or ""
         
         # Opciones de visualización
         st.markdown("### 📈 Visualización")
         sample_size = st.number_input("Tamaño de muestra", 100, 10000, 1000)
         show_raw_data = st.checkbox("Mostrar datos raw", value=True)
+        spec = LoadSpec(sample_size=int(sample_size), **spec_kwargs)
         
         # Botón de actualizar
         if st.button("🔄 Actualizar datos", use_container_width=True):
@@ -67,9 +125,11 @@ def main():
     # Área principal
     try:
         # Cargar datos según la fuente seleccionada
-        df = load_data(data_source, locals())
+        df = load_data(spec)
         
         if df is not None and not df.empty:
+            # Memoria calculada una vez por carga (deep=False: no recorre objetos Python)
+            st.session_state['df_mem_mb'] = df.memory_usage(deep=False).sum() / 1024 / 1024
             display_data_overview(df)
             
             # Tabs para diferentes vistas
@@ -98,82 +158,131 @@ def main():
         st.error(f"Error cargando datos: {str(e)}")
         st.code(str(e), language="python")
 
+@st.cache_data(ttl=60)
 def get_bronze_files():
     """Obtiene lista de archivos Bronze disponibles"""
     bronze_path = PROJECT_ROOT / "data" / "processed" / "bronze"
     if bronze_path.exists():
-        files = list(bronze_path.glob("*.parquet"))
-        return [f.name for f in files] if files else ["No hay archivos"]
+        with os.scandir(bronze_path) as it:
+            files = [e.name for e in it if e.name.endswith(".parquet") and e.is_file()]
+        return files if files else ["No hay archivos"]
     return ["Directorio no existe"]
 
-def get_csv_files():
-    """Obtiene lista de archivos CSV disponibles"""
+@st.cache_data(ttl=60)
+def _csv_index():
+    """Nombre → ruta de los CSV en raw y sus subdirectorios directos (un scandir por directorio)"""
     raw_path = PROJECT_ROOT / "data" / "raw"
-    csv_files = []
+    index = {}
+    subdirs = []
     
-    # Buscar en raw y subdirectorios
-    for path in [raw_path] + list(raw_path.glob("*/")):
-        if path.is_dir():
-            csv_files.extend([f.name for f in path.glob("*.csv")])
+    try:
+        with os.scandir(raw_path) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.path)
+                elif e.name.endswith(".csv"):
+                    index.setdefault(e.name, e.path)
+    except FileNotFoundError:
+        return index
     
+    for d in subdirs:
+        with os.scandir(d) as it:
+            for e in it:
+                if e.name.endswith(".csv") and e.is_file():
+                    index.setdefault(e.name, e.path)
+    
+    return index
+
+def get_csv_files():
+    """Obtiene lista de archivos CSV disponibles"""
+    csv_files = list(_csv_index())
     return csv_files if csv_files else ["No hay archivos CSV"]
 
-def load_data(source, filters):
+def load_data(spec):
     """Carga datos según la fuente seleccionada"""
     try:
-        if source == "Base de Datos":
-            return load_from_database(filters)
-        elif source == "Archivos Bronze":
-            return load_from_bronze(filters.get('selected_file'))
-        elif source == "Archivos CSV":
-            return load_from_csv(filters.get('selected_csv'))
+        if spec.source == "Base de Datos":
+            return load_from_database(spec.min_price, spec.max_price, spec.user, spec.date_range, spec.sample_size)
+        elif spec.source == "Archivos Bronze":
+            return load_from_bronze(spec.file)
+        elif spec.source == "Archivos CSV":
+            return load_from_csv(spec.file)
         return None
     except Exception as e:
         st.error(f"Error cargando datos: {e}")
         return None
 
-def load_from_database(filters):
+def _parse_timestamps(values):
+    """Único punto de parseo del timestamp (los loaders lo llaman; la visualización ya no re-parsea)"""
+    # pandas 2 infiere el formato del primer valor y aplica el parser vectorizado a toda la columna
+    return pd.to_datetime(values, errors='coerce')
+
+def _shrink(df):
+    """Reduce memoria: float/int al tipo más estrecho y strings repetitivos a category"""
+    for c in df.select_dtypes('float').columns:
+        df[c] = pd.to_numeric(df[c], downcast='float')
+    for c in df.select_dtypes('integer').columns:
+        df[c] = pd.to_numeric(df[c], downcast='integer')
+    if len(df):
+        for c in df.select_dtypes('object').columns:
+            if df[c].nunique() / len(df) < 0.5:
+                df[c] = df[c].astype('category')
+    return df
+
+def load_from_database(min_price, max_price, user, date_range, limit):
     """Carga datos desde la base de datos SQLite"""
     db_path = PROJECT_ROOT / "data" / "pipeline.db"
     
     if not db_path.exists():
         return None
     
+    # Días ISO del rango (inclusivo); '' desactiva el filtro
+    date_from = date_range[0].isoformat() if date_range else ""
+    date_to = date_range[-1].isoformat() if date_range else ""
+    
     try:
-        conn = sqlite3.connect(str(db_path))
-        
-        # Query base
-        query = "SELECT * FROM transactions"
-        conditions = []
-        
-        # Aplicar filtros
-        if filters.get('price_range'):
-            min_price, max_price = filters['price_range']
-            conditions.append(f"price BETWEEN {min_price} AND {max_price}")
-        
-        if filters.get('user_filter'):
-            user = filters['user_filter'].strip()
-            if user:
-                conditions.append(f"user_id = '{user}'")
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += " ORDER BY timestamp LIMIT 5000"
-        
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        
-        # Convertir timestamp si es necesario
-        if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-        
-        return df
-        
+        # El mtime invalida la caché cuando el pipeline escribe en la BD
+        return _query_database(str(db_path), sqlite_mtime(db_path), min_price, max_price, user, date_from, date_to, limit)
     except Exception as e:
         st.error(f"Error conectando a BD: {e}")
         return None
 
+def _sql_str(value):
+    """Literal SQL de texto con comillas escapadas"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _get_connection(db_path, db_ino):
+    """Conexión de solo lectura reutilizada entre reruns (el inode la renueva si la BD se recrea)"""
+    # mode=ro: el pipeline es el único escritor; el índice y WAL los define database_setup.py
+    return connect_sqlite_readonly(db_path, isolation_level=None)
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def _query_database(db_path, db_mtime, min_price, max_price, user, date_from, date_to, limit):
+    """Consulta cacheada por (ruta, mtime, filtros)"""
+    if CONNECTORX_AVAILABLE:
+        # connectorx no admite parámetros: se renderizan valores ya validados (números y texto escapado)
+        query = _TRANSACTIONS_SQL.replace("?", "{}").format(
+            float(min_price), float(max_price), _sql_str(user), _sql_str(user),
+            _sql_str(date_from), _sql_str(date_from), _sql_str(date_to), int(limit)
+        )
+        # Arrow directo desde SQLite, sin pasar por tuplas Python por fila
+        df = cx.read_sql(f"sqlite://{db_path}", query, return_type="arrow").to_pandas()
+    else:
+        conn = _get_connection(db_path, Path(db_path).stat().st_ino)
+        
+        # Solo las columnas que usa la página; filtros y límite se resuelven en SQLite
+        df = pd.read_sql_query(
+            _TRANSACTIONS_SQL, conn,
+            params=(min_price, max_price, user, user, date_from, date_from, date_to, limit)
+        )
+    
+    # Convertir timestamp si es necesario
+    if 'timestamp' in df.columns:
+        df['timestamp'] = _parse_timestamps(df['timestamp'])
+    
+    return _shrink(df)
+
 def load_from_bronze(selected_file):
     """Carga datos desde archivos Parquet Bronze"""
     if not selected_file or selected_file == "No hay archivos":
@@ -182,38 +291,88 @@ def load_from_bronze(selected_file):
     bronze_path = PROJECT_ROOT / "data" / "processed" / "bronze" / selected_file
     
     try:
-        df = pd.read_parquet(bronze_path)
-        return df.head(5000)  # Limitar para performance
+        stat = bronze_path.stat()
+        return _read_parquet_head(str(bronze_path), stat.st_mtime, stat.st_size)
     except Exception as e:
         st.error(f"Error leyendo Parquet: {e}")
         return None
 
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def _read_parquet_head(path, mtime, size):
+    """Lectura cacheada por (ruta, mtime, tamaño): un archivo modificado invalida la entrada"""
+    pf = pq.ParquetFile(path)
+    columns = [c for c in _EXPLORER_COLUMNS if c in pf.schema_arrow.names]
+    
+    # Solo las columnas usadas y solo los row groups necesarios para llegar al límite
+    tables = []
+    rows = 0
+    for rg in range(pf.num_row_groups):
+        table = pf.read_row_group(rg, columns=columns)
+        tables.append(table)
+        rows += table.num_rows
+        if rows >= _MAX_ROWS:
+            break
+    
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    
+    df = pa.concat_tables(tables).slice(0, _MAX_ROWS).to_pandas()
+    
+    if 'timestamp' in df.columns:
+        df['timestamp'] = _parse_timestamps(df['timestamp'])
+    
+    return _shrink(df)
+
 def load_from_csv(selected_csv):
     """Carga datos desde archivos CSV"""
     if not selected_csv or selected_csv == "No hay archivos CSV":
         return None
     
-    # Buscar archivo en raw y subdirectorios
-    raw_path = PROJECT_ROOT / "data" / "raw"
-    csv_path = None
-    
-    for path in [raw_path] + list(raw_path.glob("*/")):
-        if path.is_dir():
-            potential_path = path / selected_csv
-            if potential_path.exists():
-                csv_path = potential_path
-                break
+    # Ruta resuelta desde el mismo índice cacheado que alimenta el selector
+    csv_path = _csv_index().get(selected_csv)
     
     if not csv_path:
         return None
+    csv_path = Path(csv_path)
     
     try:
-        df = pd.read_csv(csv_path)
-        return df.head(5000)  # Limitar para performance
+        stat = csv_path.stat()
+        return _read_csv_head(str(csv_path), stat.st_mtime, stat.st_size)
     except Exception as e:
         st.error(f"Error leyendo CSV: {e}")
         return None
 
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def _read_csv_head(path, mtime, size):
+    """Lectura cacheada por (ruta, mtime, tamaño): un archivo modificado invalida la entrada"""
+    # Lector incremental de Arrow: se leen bloques de 1 MB hasta llegar al límite, no el archivo completo
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=1 << 20),
+        convert_options=pacsv.ConvertOptions(include_columns=list(_EXPLORER_COLUMNS), include_missing_columns=True)
+    )
+    
+    tables = []
+    rows = 0
+    for batch in reader:
+        tables.append(pa.Table.from_batches([batch]))
+        rows += batch.num_rows
+        if rows >= _MAX_ROWS:
+            break
+    
+    if not tables:
+        return pd.DataFrame(columns=list(_EXPLORER_COLUMNS))
+    
+    table = pa.concat_tables(tables).slice(0, _MAX_ROWS)
+    # Columnas ausentes en el CSV llegan como tipo null: se descartan
+    table = table.select([f.name for f in table.schema if not pa.types.is_null(f.type)])
+    df = table.to_pandas()
+    
+    if 'timestamp' in df.columns:
+        df['timestamp'] = _parse_timestamps(df['timestamp'])
+    
+    return _shrink(df)
+
 def display_data_overview(df):
     """Muestra overview general de los datos"""
     st.markdown("### 📋 Resumen de Datos")
@@ -234,16 +393,32 @@ def display_data_overview(df):
             st.metric("💰 Precio Promedio", "N/A")
     
     with col4:
-        memory_usage = df.memory_usage(deep=True).sum() / 1024 / 1024
+        memory_usage = st.session_state.get('df_mem_mb', 0.0)
         st.metric("💾 Memoria", f"{memory_usage:.1f} MB")
 
+@st.cache_data(hash_funcs=_DF_HASH, show_spinner=False)
+def _sampled(df, n):
+    """Muestra aleatoria reproducible (no solo las primeras filas), cacheada por contenido y tamaño"""
+    return df.sample(min(n, len(df)), random_state=0).sort_index()
+
+@st.cache_data(hash_funcs=_DF_HASH, show_spinner=False)
+def _col_info(df):
+    """Tipo y completitud por columna (un único df.count())"""
+    non_null = df.count().values
+    return pd.DataFrame({
+        "Columna": df.columns,
+        "Tipo": df.dtypes.astype(str).values,
+        "No Nulos": non_null,
+        "% Completo": (non_null / len(df) * 100).round(2)
+    })
+
 def display_data_table(df, show_raw, sample_size):
     """Muestra tabla de datos"""
     st.markdown("### 📋 Datos")
     
     if show_raw:
         # Muestra datos raw
-        display_df = df.head(sample_size)
+        display_df = _sampled(df, int(sample_size))
         st.dataframe(
             display_df,
             use_container_width=True,
@@ -252,17 +427,98 @@ def display_data_table(df, show_raw, sample_size):
         
         # Info adicional
         st.markdown("#### 📊 Información de Columnas")
-        info_df = pd.DataFrame({
-            "Columna": df.columns,
-            "Tipo": df.dtypes,
-            "No Nulos": df.count(),
-            "% Completo": (df.count() / len(df) * 100).round(2)
-        })
-        st.dataframe(info_df, use_container_width=True)
+        st.dataframe(_col_info(df), use_container_width=True)
     
     else:
         st.info("Datos raw ocultados. Activar en el sidebar para ver.")
 
+@st.cache_data(hash_funcs=_DF_HASH, show_spinner=False)
+def _describe(df_num):
+    """describe() cacheado por contenido"""
+    return df_num.describe()
+
+@st.cache_data(hash_funcs=_DF_HASH, show_spinner=False)
+def _corr(df_num):
+    """Matriz de correlaciones cacheada por contenido (np.corrcoef sobre un buffer float32 contiguo)"""
+    arr = df_num.to_numpy(dtype=np.float32, copy=False)
+    arr = arr[~np.isnan(arr).any(axis=1)]
+    if len(arr) < 2:
+        return df_num.corr()
+    
+    corr = np.corrcoef(arr, rowvar=False)
+    return pd.DataFrame(corr, index=df_num.columns, columns=df_num.columns)
+
+@st.cache_data(hash_funcs=_DF_HASH, show_spinner=False)
+def _user_price_stats(df_user_price):
+    """Superconjunto de agregados por usuario; gráficos y análisis derivan sus vistas de aquí"""
+    return df_user_price.groupby('user_id', observed=True, sort=False)['price'].agg(
+        ['count', 'mean', 'min', 'max', 'std']
+    )
+
+@st.cache_data(hash_funcs=_DF_HASH, show_spinner=False)
+def _outlier_summary(df_price):
+    """Estadísticas básicas + outliers (IQR) de price, cacheadas por contenido"""
+    arr = df_price['price'].dropna().to_numpy(dtype=np.float32, copy=False)
+    if arr.size == 0:
+        return None
+    
+    # Cuartiles y mediana en una sola llamada
+    q1, median, q3 = np.quantile(arr, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    outliers = arr[(arr < q1 - 1.5*iqr) | (arr > q3 + 1.5*iqr)]
+    
+    # Top-5 con introselect O(n) en lugar de ordenar todo
+    if outliers.size > 5:
+        extreme = np.sort(np.partition(outliers, -5)[-5:])[::-1]
+    else:
+        extreme = np.sort(outliers)[::-1]
+    
+    return {
+        "count": int(arr.size),
+        "mean": float(arr.mean(dtype=np.float64)),
+        "median": float(median),
+        "std": float(arr.std(dtype=np.float64, ddof=1)) if arr.size > 1 else float('nan'),
+        "min": float(arr.min()),
+        "max": float(arr.max()),
+        "outliers": int(outliers.size),
+        "extreme": extreme.tolist()
+    }
+
+@st.cache_data(hash_funcs=_DF_HASH, show_spinner=False)
+def _timeparts(df_ts):
+    """hour/day/month como int8 a partir del timestamp (cacheado por contenido)"""
+    ts = df_ts['timestamp'].dropna()  # ya parseado en el loader
+    
+    return pd.DataFrame({
+        'hour': ts.dt.hour.astype('int8'),
+        'day': ts.dt.day.astype('int8'),
+        'month': ts.dt.month.astype('int8')
+    })
+
+def _top_values(series, k=10):
+    """Top-k de frecuencias con el kernel hash de Arrow (C++) en lugar de value_counts de pandas"""
+    arr = pa.Array.from_pandas(series).drop_null()
+    if pa.types.is_dictionary(arr.type):
+        arr = arr.dictionary_decode()
+    
+    vc = pc.value_counts(arr)
+    counts = vc.field('counts')
+    top = pc.sort_indices(counts, sort_keys=[("", "descending")])[:k]
+    
+    return pd.Series(
+        counts.take(top).to_numpy(zero_copy_only=False),
+        index=vc.field('values').take(top).to_pylist(),
+        name=series.name
+    )
+
+def _pick_freq(timestamps, target_points=_TARGET_POINTS):
+    """Elige la frecuencia de remuestreo más fina que deja la serie en <= target_points"""
+    span = timestamps.max() - timestamps.min()
+    for freq in _RESAMPLE_FREQS:
+        if span / pd.Timedelta(freq) <= target_points:
+            return freq
+    return _RESAMPLE_FREQS[-1]
+
 def display_statistics(df):
     """Muestra estadísticas descriptivas"""
     st.markdown("### 📊 Estadísticas Descriptivas")
@@ -272,30 +528,24 @@ def display_statistics(df):
     
     if len(numeric_cols) > 0:
         st.markdown("#### 🔢 Columnas Numéricas")
-        st.dataframe(df[numeric_cols].describe(), use_container_width=True)
-        
-        # Estadísticas adicionales
-        col1, col2 = st.columns(2)
+        st.dataframe(_describe(df[numeric_cols]), use_container_width=True)
         
-        with col1:
-            st.markdown("#### 📈 Distribución de Valores")
-            for col in numeric_cols[:3]:  # Solo primeras 3 columnas
-                if col in df.columns:
-                    st.write(f"**{col}:**")
-                    hist_data = df[col].dropna()
-                    if len(hist_data) > 0:
-                        fig = px.histogram(x=hist_data, title=f"Distribución de {col}")
-                        st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            st.markdown("#### 📊 Box Plots")
-            for col in numeric_cols[:3]:
-                if col in df.columns:
-                    st.write(f"**{col}:**")
-                    box_data = df[col].dropna()
-                    if len(box_data) > 0:
-                        fig = px.box(y=box_data, title=f"Box Plot de {col}")
-                        st.plotly_chart(fig, use_container_width=True)
+        # Histogramas (fila 1) y box plots (fila 2) en una sola figura
+        plot_cols = [col for col in numeric_cols[:3] if df[col].notna().any()]
+        if plot_cols:
+            st.markdown("#### 📈 Distribución de Valores y Box Plots")
+            fig = make_subplots(
+                rows=2, cols=len(plot_cols),
+                subplot_titles=[f"Distribución de {col}" for col in plot_cols] + [f"Box Plot de {col}" for col in plot_cols]
+            )
+            for i, col in enumerate(plot_cols, start=1):
+                values = df[col].dropna().to_numpy()
+                # Bins calculados en el servidor: se envían los conteos, no el arreglo completo
+                counts, edges = np.histogram(values, bins='auto')
+                fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name=col), row=1, col=i)
+                fig.add_trace(go.Box(y=values, name=col), row=2, col=i)
+            fig.update_layout(showlegend=False, height=700)
+            st.plotly_chart(fig, use_container_width=True)
     
     # Estadísticas categóricas
     categorical_cols = df.select_dtypes(include=['object', 'category']).columns
@@ -305,8 +555,7 @@ def display_statistics(df):
         for col in categorical_cols:
             if col in df.columns:
                 st.write(f"**{col}:**")
-                value_counts = df[col].value_counts().head(10)
-                st.bar_chart(value_counts)
+                st.bar_chart(_top_values(df[col]))
 
 def display_charts(df):
     """Muestra gráficos interactivos"""
@@ -318,20 +567,18 @@ def display_charts(df):
             st.markdown("#### 📅 Precios en el Tiempo")
             
             # Preparar datos para la serie temporal
-            df_time = df.copy()
-            if df_time['timestamp'].dtype == 'object':
-                df_time['timestamp'] = pd.to_datetime(df_time['timestamp'], errors='coerce')
-            
-            df_time = df_time.dropna(subset=['timestamp', 'price'])
-            df_time = df_time.sort_values('timestamp')
+            # Proyección estrecha en lugar de copiar el frame completo
+            df_time = df.loc[:, ['timestamp', 'price']].dropna().sort_values('timestamp', kind='stable')
             
             if len(df_time) > 0:
+                # Remuestrear a ~1000 puntos: el navegador no necesita más para esta resolución
+                ts = (df_time.set_index('timestamp')['price']
+                      .resample(_pick_freq(df_time['timestamp'])).mean().dropna())
                 fig = px.line(
-                    df_time, 
-                    x='timestamp', 
-                    y='price',
+                    x=ts.index, 
+                    y=ts.values,
                     title="Evolución de Precios",
-                    labels={'price': 'Precio ($)', 'timestamp': 'Fecha'}
+                    labels={'y': 'Precio ($)', 'x': 'Fecha'}
                 )
                 st.plotly_chart(fig, use_container_width=True)
         
@@ -339,8 +586,7 @@ def display_charts(df):
         if 'user_id' in df.columns:
             st.markdown("#### 👥 Precios por Usuario")
             
-            user_stats = df.groupby('user_id')['price'].agg(['mean', 'count']).reset_index()
-            user_stats = user_stats.sort_values('mean', ascending=False).head(10)
+            user_stats = _user_price_stats(df[['user_id', 'price']]).nlargest(10, 'mean')[['mean']].reset_index()
             
             fig = px.bar(
                 user_stats,
@@ -356,7 +602,7 @@ def display_charts(df):
         if len(numeric_cols) > 1:
             st.markdown("#### 🔥 Mapa de Correlaciones")
             
-            corr_matrix = df[numeric_cols].corr()
+            corr_matrix = _corr(df[numeric_cols])
             
             fig = px.imshow(
                 corr_matrix,
@@ -376,38 +622,29 @@ def display_analysis(df):
         with col1:
             st.markdown("#### 📊 Análisis de Precios")
             
-            price_data = df['price'].dropna()
+            summary = _outlier_summary(df[['price']])
             
-            if len(price_data) > 0:
+            if summary is not None:
                 # Estadísticas básicas
                 st.write("**Estadísticas:**")
-                st.write(f"- Media: ${price_data.mean():.2f}")
-                st.write(f"- Mediana: ${price_data.median():.2f}")
-                st.write(f"- Desviación estándar: ${price_data.std():.2f}")
-                st.write(f"- Rango: ${price_data.min():.2f} - ${price_data.max():.2f}")
-                
-                # Detectar outliers
-                Q1 = price_data.quantile(0.25)
-                Q3 = price_data.quantile(0.75)
-                IQR = Q3 - Q1
-                outliers = price_data[(price_data < Q1 - 1.5*IQR) | (price_data > Q3 + 1.5*IQR)]
+                st.write(f"- Media: ${summary['mean']:.2f}")
+                st.write(f"- Mediana: ${summary['median']:.2f}")
+                st.write(f"- Desviación estándar: ${summary['std']:.2f}")
+                st.write(f"- Rango: ${summary['min']:.2f} - ${summary['max']:.2f}")
                 
-                st.write(f"- Outliers detectados: {len(outliers)} ({len(outliers)/len(price_data)*100:.1f}%)")
+                # Outliers
+                st.write(f"- Outliers detectados: {summary['outliers']} ({summary['outliers']/summary['count']*100:.1f}%)")
                 
-                if len(outliers) > 0:
+                if summary['outliers'] > 0:
                     st.write("**Outliers extremos:**")
-                    extreme_outliers = outliers.nlargest(5)
-                    for val in extreme_outliers:
+                    for val in summary['extreme']:
                         st.write(f"  - ${val:.2f}")
         
         with col2:
             st.markdown("#### 👥 Análisis de Usuarios")
             
             if 'user_id' in df.columns:
-                user_analysis = df.groupby('user_id').agg({
-                    'price': ['count', 'mean', 'min', 'max', 'std']
-                }).round(2)
-                
+                user_analysis = _user_price_stats(df[['user_id', 'price']]).round(2)
                 user_analysis.columns = ['Transacciones', 'Precio_Medio', 'Precio_Min', 'Precio_Max', 'Precio_Std']
                 user_analysis = user_analysis.reset_index()
                 
@@ -428,18 +665,10 @@ def display_analysis(df):
     if 'timestamp' in df.columns:
         st.markdown("#### 📅 Análisis Temporal")
         
-        df_temp = df.copy()
-        if df_temp['timestamp'].dtype == 'object':
-            df_temp['timestamp'] = pd.to_datetime(df_temp['timestamp'], errors='coerce')
-        
-        df_temp = df_temp.dropna(subset=['timestamp'])
+        # Componentes de fecha calculados una vez por versión del dataset
+        df_temp = _timeparts(df[['timestamp']])
         
         if len(df_temp) > 0:
-            # Extraer componentes de fecha
-            df_temp['hour'] = df_temp['timestamp'].dt.hour
-            df_temp['day'] = df_temp['timestamp'].dt.day
-            df_temp['month'] = df_temp['timestamp'].dt.month
-            
             col1, col2 = st.columns(2)
             
             with col1:
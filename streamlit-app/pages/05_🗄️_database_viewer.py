@@ -10,12 +10,124 @@ import sqlite3
 import pandas as pd
 from pathlib import Path
 import sys
+import io
+from operator import itemgetter
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from packaging.version import Version
+
+try:
+    import adbc_driver_sqlite.dbapi as adbc_sqlite
+    ADBC_AVAILABLE = True
+except ImportError:
+    ADBC_AVAILABLE = False
 
 # Configurar paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 SRC_PATH = PROJECT_ROOT / "src"
 sys.path.insert(0, str(SRC_PATH))
 
+from config.database_config import sqlite_mtime, connect_sqlite_readonly
+
+_SCHEMA_COLUMNS_SQL = (
+    "SELECT m.name, c.cid, c.name, c.type, c.\"notnull\", c.dflt_value, c.pk "
+    "FROM sqlite_master m, pragma_table_info(m.name) c WHERE m.type = 'table' ORDER BY m.name, c.cid"
+)
+_SCHEMA_INDEXES_SQL = (
+    "SELECT m.name, i.seq, i.name, i.\"unique\", i.origin, i.partial "
+    "FROM sqlite_master m, pragma_index_list(m.name) i WHERE m.type = 'table' ORDER BY m.name, i.seq"
+)
+# Páginas servidas desde el mapeo del archivo (sin pread ni copia a espacio de usuario)
+_MMAP_SIZE = 256 * 1024 * 1024
+_CACHE_SIZE_KIB = 20000
+# Espera nativa de SQLite ante SQLITE_BUSY mientras el pipeline escribe
+_BUSY_TIMEOUT_MS = 5000
+_PRAGMA_SETTINGS = (
+    "page_size", "cache_size", "temp_store", "journal_mode",
+    "synchronous", "foreign_keys", "auto_vacuum"
+)
+
+# Textos fijos: se construyen una sola vez al importar la página
+_QUICK_STATS_SQL = """SELECT 
+    COUNT(*) as total_records,
+    AVG(price) as avg_price,
+    MIN(price) as min_price,
+    MAX(price) as max_price,
+    COUNT(DISTINCT user_id) as unique_users,
+    COUNT(DISTINCT source_file) as unique_files
+FROM transactions
+"""
+_QUICK_BY_USER_SQL = """SELECT 
+    user_id,
+    COUNT(*) as transactions,
+    AVG(price) as avg_price,
+    MIN(price) as min_price,
+    MAX(price) as max_price
+FROM transactions 
+GROUP BY user_id 
+ORDER BY transactions DESC 
+LIMIT 20
+"""
+_SQL_EXAMPLES = """-- Estadísticas básicas
+SELECT COUNT(*) as total, AVG(price) as avg_price, MIN(price) as min_price, MAX(price) as max_price 
+FROM transactions;
+
+-- Top usuarios por transacciones
+SELECT user_id, COUNT(*) as transactions, AVG(price) as avg_price 
+FROM transactions 
+GROUP BY user_id 
+ORDER BY transactions DESC 
+LIMIT 10;
+
+-- Transacciones por archivo fuente
+SELECT source_file, COUNT(*) as count, AVG(price) as avg_price 
+FROM transactions 
+GROUP BY source_file;
+
+-- Precios por rango
+SELECT 
+    CASE 
+        WHEN price < 20 THEN 'Bajo (< $20)'
+        WHEN price < 50 THEN 'Medio ($20-$50)'
+        WHEN price < 80 THEN 'Alto ($50-$80)'
+        ELSE 'Muy Alto (> $80)'
+    END as price_range,
+    COUNT(*) as count
+FROM transactions 
+GROUP BY price_range;
+
+-- Verificación de batches
+SELECT batch_id, COUNT(*) as records, source_file 
+FROM transactions 
+WHERE batch_id IS NOT NULL 
+GROUP BY batch_id 
+ORDER BY records DESC;
+"""
+
+# st.download_button acepta un callable (generación diferida) desde Streamlit 1.50
+_LAZY_DOWNLOAD = Version(st.__version__) >= Version("1.50")
+# Columnas ArrowDtype al leer con pandas (dtype_backend existe desde pandas 2.0)
+_READ_SQL_KWARGS = {"dtype_backend": "pyarrow"} if Version(pd.__version__) >= Version("2.0") else {}
+_WRITE_ACTIONS = frozenset(
+    getattr(sqlite3, name) for name in (
+        "SQLITE_INSERT", "SQLITE_UPDATE", "SQLITE_DELETE", "SQLITE_ALTER_TABLE",
+        "SQLITE_CREATE_TABLE", "SQLITE_CREATE_INDEX", "SQLITE_CREATE_VIEW", "SQLITE_CREATE_TRIGGER",
+        "SQLITE_CREATE_TEMP_TABLE", "SQLITE_CREATE_TEMP_INDEX", "SQLITE_CREATE_TEMP_VIEW",
+        "SQLITE_CREATE_TEMP_TRIGGER", "SQLITE_DROP_TABLE", "SQLITE_DROP_INDEX", "SQLITE_DROP_VIEW",
+        "SQLITE_DROP_TRIGGER", "SQLITE_DROP_TEMP_TABLE", "SQLITE_DROP_TEMP_INDEX",
+        "SQLITE_DROP_TEMP_VIEW", "SQLITE_DROP_TEMP_TRIGGER", "SQLITE_ATTACH", "SQLITE_DETACH"
+    )
+)
+# PRAGMAs cuyo argumento es solo un nombre de tabla/índice (las usan las funciones pragma_*() del esquema)
+_SCHEMA_PRAGMAS = frozenset((
+    "table_info", "table_xinfo", "index_list", "index_info", "index_xinfo", "foreign_key_list"
+))
+# Consultas que pueden ir por ADBC (sin authorizer); el resto usa la conexión sqlite3 protegida
+_ADBC_PREFIXES = ("SELECT", "WITH")
+# Códigos de SQLite de una escritura rechazada (authorizer o conexión mode=ro)
+_WRITE_DENIED_CODES = frozenset((sqlite3.SQLITE_AUTH, sqlite3.SQLITE_READONLY))
+
 st.set_page_config(page_title="Database Viewer", page_icon="🗄️", layout="wide")
 
 def main():
@@ -39,11 +151,14 @@ def main():
         
         try:
             # Información del archivo
-            file_size = db_path.stat().st_size / 1024 / 1024
+            config = _db_config(str(db_path), sqlite_mtime(db_path))
+            file_size = config["page_count"] * config["page_size"] / 1024 / 1024
             st.metric("📁 Tamaño", f"{file_size:.2f} MB")
             
             # Información de tablas
             tables_info = get_tables_info(db_path)
+            # Las pestañas reutilizan este resultado en el mismo rerun
+            st.session_state["tables_info"] = tables_info
             
             st.markdown("### 📋 Tablas")
             for table_name, count in tables_info.items():
@@ -56,35 +171,15 @@ def main():
             selected_table = st.selectbox("Tabla", list(tables_info.keys()))
             
             if st.button("📊 Ver muestra", use_container_width=True):
-                st.session_state.quick_query = f"SELECT * FROM {selected_table} LIMIT 100"
+                st.session_state.quick_query = f"SELECT * FROM {_quote_ident(selected_table)} LIMIT 100"
             
             if st.button("📈 Estadísticas", use_container_width=True):
                 if selected_table == "transactions":
-                    st.session_state.quick_query = """
-                    SELECT 
-                        COUNT(*) as total_records,
-                        AVG(price) as avg_price,
-                        MIN(price) as min_price,
-                        MAX(price) as max_price,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COUNT(DISTINCT source_file) as unique_files
-                    FROM transactions
-                    """
+                    st.session_state.quick_query = _QUICK_STATS_SQL
             
             if st.button("🏷️ Por usuario", use_container_width=True):
                 if selected_table == "transactions":
-                    st.session_state.quick_query = """
-                    SELECT 
-                        user_id,
-                        COUNT(*) as transactions,
-                        AVG(price) as avg_price,
-                        MIN(price) as min_price,
-                        MAX(price) as max_price
-                    FROM transactions 
-                    GROUP BY user_id 
-                    ORDER BY transactions DESC 
-                    LIMIT 20
-                    """
+                    st.session_state.quick_query = _QUICK_BY_USER_SQL
         
         except Exception as e:
             st.error(f"Error: {e}")
@@ -101,29 +196,112 @@ def main():
     with tab3:
         display_schema_info(db_path)
 
+def _deny_writes(action, arg1, arg2, db_name, trigger):
+    """Authorizer de SQLite: rechaza cualquier operación de escritura o DDL al preparar el statement"""
+    # Las funciones pragma_*() reportan SQLITE_UPDATE sobre sqlite_master al preparar
+    # (SQLite 3.40) sin escribir nada; la conexión mode=ro sigue bloqueando un UPDATE real
+    if action == sqlite3.SQLITE_UPDATE and arg1 == "sqlite_master" and trigger is None:
+        return sqlite3.SQLITE_OK
+    # PRAGMA x = valor cambiaría la conexión compartida por todas las sesiones (mode=ro no lo impide)
+    if action == sqlite3.SQLITE_PRAGMA and arg2 is not None and arg1 not in _SCHEMA_PRAGMAS:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_DENY if action in _WRITE_ACTIONS else sqlite3.SQLITE_OK
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_conn(db_path_str, db_ino):
+    """Conexión de solo lectura compartida entre reruns (el inode la renueva si la BD se recrea)"""
+    conn = connect_sqlite_readonly(
+        db_path_str,
+        cache_size_kib=_CACHE_SIZE_KIB,
+        mmap_size=_MMAP_SIZE,
+        cached_statements=256  # caché de statements preparados; vive lo que vive la conexión
+    )
+    conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+    conn.set_authorizer(_deny_writes)
+    return conn
+
+def _conn(db_path):
+    """Conexión cacheada para la BD indicada"""
+    return get_conn(str(db_path), Path(db_path).stat().st_ino)
+
+def _quote_ident(name):
+    """Identificador SQL entre comillas dobles"""
+    return '"' + name.replace('"', '""') + '"'
+
+def _quote_literal(value):
+    """Literal SQL de texto entre comillas simples"""
+    return "'" + value.replace("'", "''") + "'"
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _db_config(db_path_str, mtime):
+    """page_count, versión y PRAGMAs de configuración en un solo SELECT sobre pragma_*()"""
+    conn = _conn(db_path_str)
+    names = ("page_count",) + _PRAGMA_SETTINGS
+    
+    try:
+        row = conn.execute(
+            "SELECT sqlite_version(), " + ", ".join(f"(SELECT * FROM pragma_{name}())" for name in names)
+        ).fetchone()
+        return dict(zip(("sqlite_version",) + names, row))
+    except sqlite3.Error:
+        # Builds de SQLite sin alguna función pragma_*: se consulta una a una
+        config = {"sqlite_version": conn.execute("SELECT sqlite_version()").fetchone()[0]}
+        for name in names:
+            try:
+                value = conn.execute(f"PRAGMA {name}").fetchone()
+                config[name] = value[0] if value else None
+            except sqlite3.Error:
+                config[name] = None
+        return config
+
 def get_tables_info(db_path):
     """Obtiene información de las tablas"""
     try:
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        
-        # Obtener lista de tablas
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-        
-        tables_info = {}
-        for table in tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            count = cursor.fetchone()[0]
-            tables_info[table] = count
-        
-        conn.close()
-        return tables_info
-    
+        # El mtime invalida la caché en cuanto el pipeline escribe en la BD
+        return _tables_info(str(db_path), sqlite_mtime(db_path))
     except Exception as e:
         st.error(f"Error obteniendo info de tablas: {e}")
         return {}
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _tables_info(db_path_str, mtime):
+    """Conteo por tabla, cacheado por (ruta, mtime)"""
+    conn = _conn(db_path_str)
+    cursor = conn.cursor()
+    
+    # Obtener lista de tablas
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    # Se itera el cursor directamente: sin lista intermedia de tuplas
+    tables = list(map(itemgetter(0), cursor))
+    
+    if not tables:
+        return {}
+    
+    # Un único statement para todos los conteos
+    sql = " UNION ALL ".join(
+        f"SELECT {_quote_literal(t)} AS name, COUNT(*) AS n FROM {_quote_ident(t)}" for t in tables
+    )
+    cursor.execute(sql)
+    return dict(cursor)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _schema_all(db_path_str, mtime):
+    """Columnas e índices de todas las tablas en dos consultas (pragma_* como funciones de tabla)"""
+    conn = _conn(db_path_str)
+    schema = {}
+    
+    for table, *column in conn.execute(_SCHEMA_COLUMNS_SQL):
+        schema.setdefault(table, ([], []))[0].append(tuple(column))
+    
+    for table, *index in conn.execute(_SCHEMA_INDEXES_SQL):
+        schema.setdefault(table, ([], []))[1].append(tuple(index))
+    
+    return schema
+
+def _table_schema(db_path_str, mtime, table):
+    """(columnas, índices) de una tabla, desde el esquema completo cacheado por (ruta, mtime)"""
+    return _schema_all(db_path_str, mtime).get(table, ([], []))
+
 def display_sql_interface(db_path):
     """Muestra interfaz para consultas SQL"""
     st.markdown("### 🔍 Ejecutor de Consultas SQL")
@@ -150,84 +328,80 @@ def display_sql_interface(db_path):
     
     # Ejemplos de consultas
     with st.expander("💡 Ejemplos de Consultas"):
-        st.code("""
--- Estadísticas básicas
-SELECT COUNT(*) as total, AVG(price) as avg_price, MIN(price) as min_price, MAX(price) as max_price 
-FROM transactions;
-
--- Top usuarios por transacciones
-SELECT user_id, COUNT(*) as transactions, AVG(price) as avg_price 
-FROM transactions 
-GROUP BY user_id 
-ORDER BY transactions DESC 
-LIMIT 10;
-
--- Transacciones por archivo fuente
-SELECT source_file, COUNT(*) as count, AVG(price) as avg_price 
-FROM transactions 
-GROUP BY source_file;
-
--- Precios por rango
-SELECT 
-    CASE 
-        WHEN price < 20 THEN 'Bajo (< $20)'
-        WHEN price < 50 THEN 'Medio ($20-$50)'
-        WHEN price < 80 THEN 'Alto ($50-$80)'
-        ELSE 'Muy Alto (> $80)'
-    END as price_range,
-    COUNT(*) as count
-FROM transactions 
-GROUP BY price_range;
-
--- Verificación de batches
-SELECT batch_id, COUNT(*) as records, source_file 
-FROM transactions 
-WHERE batch_id IS NOT NULL 
-GROUP BY batch_id 
-ORDER BY records DESC;
-        """, language="sql")
+        st.code(_SQL_EXAMPLES, language="sql")
+    
+    deep_memory = st.checkbox("Calcular memoria profunda", value=False,
+                              help="Recorre cada string de la respuesta; más lento en resultados grandes")
     
     # Ejecutar consulta
     if execute_button and sql_query.strip():
-        execute_sql_query(db_path, sql_query)
+        execute_sql_query(db_path, sql_query, deep_memory)
+
+def _run_query(db_path, query):
+    """Ejecuta la consulta: Arrow directo con ADBC si está instalado, pandas vía sqlite3 si no"""
+    # mode=ro no impide VACUUM INTO ni ATTACH: ADBC solo recibe un único SELECT/WITH
+    statement = query.strip().rstrip(";")
+    if ADBC_AVAILABLE and statement.upper().startswith(_ADBC_PREFIXES) and ";" not in statement:
+        with adbc_sqlite.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro") as adbc_conn:
+            with adbc_conn.cursor() as cursor:
+                cursor.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+                cursor.execute(query)
+                return cursor.fetch_arrow_table()
+    
+    return pd.read_sql_query(query, _conn(db_path), **_READ_SQL_KWARGS)
+
+def _is_write_denied(error):
+    """True si el error (o el sqlite3.Error que pandas re-empaqueta en __cause__) es una escritura rechazada"""
+    while error is not None and not isinstance(error, sqlite3.Error):
+        error = error.__cause__
+    return getattr(error, "sqlite_errorcode", None) in _WRITE_DENIED_CODES
 
-def execute_sql_query(db_path, query):
+def execute_sql_query(db_path, query, deep_memory=False):
     """Ejecuta una consulta SQL y muestra resultados"""
     try:
-        conn = sqlite3.connect(str(db_path))
-        
-        # Verificar que la consulta sea segura (solo SELECT)
-        query_upper = query.strip().upper()
-        if not query_upper.startswith('SELECT'):
-            st.error("❌ Solo se permiten consultas SELECT por seguridad")
-            return
-        
-        # Ejecutar consulta
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        # La seguridad la aplica SQLite: conexión mode=ro + authorizer que rechaza escrituras
+        try:
+            result = _run_query(db_path, query)
+        except Exception as e:
+            if _is_write_denied(e):
+                st.error("❌ Solo se permiten consultas de lectura por seguridad")
+                return
+            raise
+        is_arrow = isinstance(result, pa.Table)
+        n_rows = result.num_rows if is_arrow else len(result)
+        n_cols = result.num_columns if is_arrow else len(result.columns)
         
         # Mostrar resultados
-        if len(df) > 0:
-            st.success(f"✅ Consulta ejecutada: {len(df)} filas retornadas")
+        if n_rows > 0:
+            st.success(f"✅ Consulta ejecutada: {n_rows} filas retornadas")
             
             # Métricas rápidas
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("📊 Filas", len(df))
+                st.metric("📊 Filas", n_rows)
             with col2:
-                st.metric("📊 Columnas", len(df.columns))
+                st.metric("📊 Columnas", n_cols)
             with col3:
-                memory_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
-                st.metric("💾 Memoria", f"{memory_mb:.2f} MB")
+                # Arrow: nbytes es O(1); pandas: superficial salvo que se pida el recorrido profundo
+                if is_arrow:
+                    memory_bytes = result.nbytes
+                else:
+                    memory_bytes = result.memory_usage(index=False, deep=deep_memory).sum()
+                st.metric("💾 Memoria", f"{memory_bytes / 1024 / 1024:.2f} MB")
+            
+            # Tabla de resultados (Streamlit serializa Arrow sin pasar por pandas)
+            st.dataframe(result, use_container_width=True, height=400)
             
-            # Tabla de resultados
-            st.dataframe(df, use_container_width=True, height=400)
+            # Opción de descargar: el CSV se genera solo al hacer clic cuando Streamlit admite callables
+            def _csv():
+                table = result if is_arrow else pa.Table.from_pandas(result, preserve_index=False)
+                buf = io.BytesIO()
+                pacsv.write_csv(table, buf)
+                return buf.getvalue()
             
-            # Opción de descargar
-            csv = df.to_csv(index=False)
             st.download_button(
                 label="📥 Descargar CSV",
-                data=csv,
+                data=_csv if _LAZY_DOWNLOAD else _csv(),
                 file_name=f"query_result_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv"
             )
@@ -243,7 +417,7 @@ def display_table_explorer(db_path):
     st.markdown("### 📊 Explorador de Tablas")
     
     try:
-        tables_info = get_tables_info(db_path)
+        tables_info = st.session_state.get("tables_info") or get_tables_info(db_path)
         
         if not tables_info:
             st.warning("No se encontraron tablas")
@@ -252,8 +426,9 @@ def display_table_explorer(db_path):
         # Selector de tabla
         selected_table = st.selectbox("Selecciona una tabla", list(tables_info.keys()))
         
-        if selected_table:
-            conn = sqlite3.connect(str(db_path))
+        # Los identificadores no admiten binding: solo se interpolan nombres de tablas existentes
+        if selected_table in tables_info:
+            conn = _conn(db_path)
             
             # Información de la tabla
             st.markdown(f"#### 📋 Tabla: `{selected_table}`")
@@ -265,120 +440,151 @@ def display_table_explorer(db_path):
             
             with col2:
                 # Obtener info de columnas
-                cursor = conn.cursor()
-                cursor.execute(f"PRAGMA table_info({selected_table})")
-                columns_info = cursor.fetchall()
+                columns_info, _ = _table_schema(str(db_path), sqlite_mtime(db_path), selected_table)
                 st.metric("📊 Total columnas", len(columns_info))
             
             # Mostrar esquema de la tabla
             st.markdown("##### 🏗️ Esquema")
-            schema_df = pd.DataFrame(columns_info, columns=['Index', 'Nombre', 'Tipo', 'NotNull', 'Default', 'PK'])
-            st.dataframe(schema_df, use_container_width=True)
+            st.dataframe(
+                [dict(zip(('Index', 'Nombre', 'Tipo', 'NotNull', 'Default', 'PK'), row)) for row in columns_info],
+                use_container_width=True
+            )
             
             # Muestra de datos
             st.markdown("##### 📋 Muestra de Datos")
             
+            # Paginación por keyset sobre la PK (o rowid): coste O(log n) sin importar la página
+            pk_cols = [col[1] for col in columns_info if col[5]]
+            key = _quote_ident(pk_cols[0]) if len(pk_cols) == 1 else "rowid"
+            cursor_key = f"{selected_table}_cursor"
+            last_key = f"{selected_table}_last_key"
+            
+            # Pila con la clave inicial de cada página visitada (None = primera página)
+            page_starts = st.session_state.setdefault(cursor_key, [None])
+            
             # Controles para la muestra
-            col1, col2 = st.columns(2)
+            col1, col2, col3 = st.columns([2, 1, 1])
             with col1:
                 limit = st.number_input("Número de filas", 1, 1000, 100)
-            with col2:
-                offset = st.number_input("Saltar filas", 0, tables_info[selected_table], 0)
             
-            # Cargar y mostrar datos
-            query = f"SELECT * FROM {selected_table} LIMIT {limit} OFFSET {offset}"
-            df = pd.read_sql_query(query, conn)
+            # Cargar datos antes de los botones: "Siguiente" depende de si esta página se llenó
+            start = page_starts[-1]
+            if start is None:
+                query = f"SELECT {key} AS _page_key, * FROM {_quote_ident(selected_table)} ORDER BY {key} LIMIT ?"
+                params = (int(limit),)
+            else:
+                query = f"SELECT {key} AS _page_key, * FROM {_quote_ident(selected_table)} WHERE {key} > ? ORDER BY {key} LIMIT ?"
+                params = (start, int(limit))
+            df = pd.read_sql_query(query, conn, params=params, **_READ_SQL_KWARGS)
+            
+            # Clave del último registro: solo hay página siguiente si esta se llenó
+            page_end = df['_page_key'].iloc[-1] if len(df) == limit else None
+            st.session_state[last_key] = page_end.item() if hasattr(page_end, 'item') else page_end
+            df = df.drop(columns='_page_key')
+            
+            with col2:
+                st.button("⬅️ Anterior", use_container_width=True, disabled=len(page_starts) == 1,
+                          on_click=_page_back, args=(cursor_key,))
+            with col3:
+                st.button("➡️ Siguiente", use_container_width=True,
+                          disabled=st.session_state[last_key] is None,
+                          on_click=_page_next, args=(cursor_key, last_key))
+            st.caption(f"Página {len(page_starts)}")
             
             if len(df) > 0:
                 st.dataframe(df, use_container_width=True, height=400)
                 
-                # Estadísticas rápidas para columnas numéricas
+                # Estadísticas rápidas para columnas numéricas (solo si el usuario las pide)
                 numeric_cols = df.select_dtypes(include=['number']).columns
                 if len(numeric_cols) > 0:
-                    st.markdown("##### 📊 Estadísticas Rápidas")
-                    stats_df = df[numeric_cols].describe()
-                    st.dataframe(stats_df, use_container_width=True)
+                    with st.expander("📊 Estadísticas Rápidas"):
+                        if st.checkbox("Calcular estadísticas", key=f"{selected_table}_stats"):
+                            table = pa.Table.from_pandas(df[numeric_cols], preserve_index=False)
+                            st.dataframe(_numeric_stats(table), use_container_width=True)
             
-            conn.close()
     
     except Exception as e:
         st.error(f"Error en explorador: {e}")
 
+def _numeric_stats(table):
+    """count, media, desviación, mínimo y máximo por columna con kernels de pyarrow.compute"""
+    stats = []
+    for name in table.column_names:
+        column = table[name]
+        min_max = pc.min_max(column)
+        stats.append({
+            "Columna": name,
+            "count": len(column) - column.null_count,
+            "mean": pc.mean(column).as_py(),
+            "std": pc.stddev(column, ddof=1).as_py(),
+            "min": min_max["min"].as_py(),
+            "max": min_max["max"].as_py()
+        })
+    return stats
+
+def _page_back(cursor_key):
+    """Vuelve a la página anterior del explorador"""
+    if len(st.session_state[cursor_key]) > 1:
+        st.session_state[cursor_key].pop()
+
+def _page_next(cursor_key, last_key):
+    """Avanza a la página que empieza después del último registro mostrado"""
+    if st.session_state.get(last_key) is not None:
+        st.session_state[cursor_key].append(st.session_state[last_key])
+
 def display_schema_info(db_path):
     """Muestra información del esquema de la base de datos"""
     st.markdown("### 📋 Esquema de Base de Datos")
     
     try:
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
+        # Obtener todas las tablas (con sus conteos, de la caché compartida)
+        db_mtime = sqlite_mtime(db_path)
+        tables_info = st.session_state.get("tables_info") or get_tables_info(db_path)
         
-        # Obtener todas las tablas
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-        
-        for table in tables:
+        for table in tables_info:
             with st.expander(f"📊 Tabla: {table}"):
-                # Información de columnas
-                cursor.execute(f"PRAGMA table_info({table})")
-                columns_info = cursor.fetchall()
+                # Información de columnas e índices
+                columns_info, indexes = _table_schema(str(db_path), db_mtime, table)
                 
                 if columns_info:
-                    columns_df = pd.DataFrame(
-                        columns_info, 
-                        columns=['Index', 'Nombre', 'Tipo', 'NotNull', 'Default', 'PrimaryKey']
+                    st.dataframe(
+                        [dict(zip(('Index', 'Nombre', 'Tipo', 'NotNull', 'Default', 'PrimaryKey'), row)) for row in columns_info],
+                        use_container_width=True
                     )
-                    st.dataframe(columns_df, use_container_width=True)
                 
                 # Índices de la tabla
-                cursor.execute(f"PRAGMA index_list({table})")
-                indexes = cursor.fetchall()
-                
                 if indexes:
                     st.markdown("**Índices:**")
                     for idx in indexes:
                         st.write(f"- {idx[1]} ({'UNIQUE' if idx[2] else 'NON-UNIQUE'})")
                 
                 # Conteo de registros
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
+                count = tables_info.get(table, 0)
                 st.metric("Total registros", f"{count:,}")
         
         # Información adicional
         st.markdown("---")
         st.markdown("### 🔧 Información Técnica")
         
-        # Tamaño de la base de datos
-        file_size = db_path.stat().st_size
+        config = _db_config(str(db_path), db_mtime)
+        
+        # Tamaño de la base de datos (páginas * tamaño de página, sin stat adicional)
+        file_size = config["page_count"] * config["page_size"]
         st.metric("Tamaño archivo", f"{file_size / 1024 / 1024:.2f} MB")
         
         # Versión de SQLite
-        cursor.execute("SELECT sqlite_version()")
-        sqlite_version = cursor.fetchone()[0]
-        st.info(f"SQLite versión: {sqlite_version}")
+        st.info(f"SQLite versión: {config['sqlite_version']}")
         
         # Configuración de la BD
         st.markdown("#### ⚙️ Configuración")
         
-        pragma_settings = [
-            "page_size", "cache_size", "temp_store", "journal_mode", 
-            "synchronous", "foreign_keys", "auto_vacuum"
+        config_data = [
+            {"Configuración": setting, "Valor": config[setting]}
+            for setting in _PRAGMA_SETTINGS if config.get(setting) is not None
         ]
         
-        config_data = []
-        for setting in pragma_settings:
-            try:
-                cursor.execute(f"PRAGMA {setting}")
-                value = cursor.fetchone()
-                if value:
-                    config_data.append({"Configuración": setting, "Valor": value[0]})
-            except:
-                pass
-        
         if config_data:
-            config_df = pd.DataFrame(config_data)
-            st.dataframe(config_df, use_container_width=True)
-        
-        conn.close()
+            st.dataframe(config_data, use_container_width=True)
     
     except Exception as e:
         st.error(f"Error obteniendo esquema: {e}")
@@ -10,28 +10,167 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sqlite3
 import json
 import subprocess
 import os
-from pathlib import Path
 import sys
+import re
+from pathlib import Path
+from dataclasses import dataclass, astuple
 from datetime import datetime
 import time
+import functools
+import logging
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
 
 # Configurar paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 SRC_PATH = PROJECT_ROOT / "src"
-sys.path.insert(0, str(SRC_PATH))
+# Necesario para la config compartida (config.database_config); sin duplicarlo en cada rerun
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from config.database_config import sqlite_mtime, connect_sqlite_readonly
+
+DB_PATH = PROJECT_ROOT / "data" / "pipeline.db"
+STATS_PATH = PROJECT_ROOT / "data" / "processed" / "pipeline_statistics.json"
+# Lo escribe el pipeline al terminar validation.csv (antes/después ya calculados)
+VALIDATION_DONE_PATH = PROJECT_ROOT / "data" / "processed" / "validation.done"
+
+_AGG_SQL = """
+SELECT 
+    COUNT(*) as total_records,
+    AVG(price) as average_price,
+    MIN(price) as minimum_price,
+    MAX(price) as maximum_price,
+    SUM(price) as total_sum
+FROM transactions
+"""
+# Textos constantes: el caché de statements de sqlite3 reutiliza su plan entre reruns
+# source_file guarda el nombre del CSV de origen (Bronze escribe csv_path.name): la igualdad usa idx_source_file (un LIKE '%...%' no)
+_VALIDATION_EXISTS_SQL = "SELECT EXISTS(SELECT 1 FROM transactions WHERE source_file = 'validation.csv')"
+_VALIDATION_AGG_SQL = """
+SELECT 
+    COUNT(*) as validation_records,
+    AVG(price) as validation_avg,
+    MIN(price) as validation_min,
+    MAX(price) as validation_max
+FROM transactions
+WHERE source_file = 'validation.csv'
+"""
+# COUNT(DISTINCT) ignora NULL: batch_id no necesita filtro aparte
+_DISTINCTS_SQL = """
+SELECT 
+    COUNT(DISTINCT user_id),
+    COUNT(DISTINCT source_file),
+    COUNT(DISTINCT batch_id)
+FROM transactions
+"""
+_ROW_COUNT_SQL = "SELECT count FROM transactions_agg WHERE id = 1"
+_TOTAL_COUNT_SQL = "SELECT COUNT(*) FROM transactions"
+_DISTINCT_LABELS = ("👥 Usuarios únicos", "📄 Archivos procesados", "📦 Batches únicos")
+_COMPARISON_METRICS = ("Recuento Total", "Valor Promedio", "Valor Mínimo", "Valor Máximo")
+_FILE_SUMMARY_SQL = """
+SELECT 
+    source_file,
+    COUNT(*),
+    COUNT(DISTINCT batch_id),
+    MIN(price),
+    MAX(price),
+    AVG(price)
+FROM transactions
+GROUP BY source_file
+ORDER BY source_file
+"""
+# Una fila mantenida por triggers (ver DatabaseManager): sin escanear transactions
+_AGG_TABLE_SQL = "SELECT count, sum / NULLIF(count, 0), min, max, sum FROM transactions_agg WHERE id = 1"
+# Texto fijo del método incremental: se construye una vez al importar
+_METHOD_INFO_MD = """
+**⚡ Información Técnica:**
+- 🔄 Método: Estadísticas Incrementales O(1)
+- ✅ Ventaja: NO recalcula desde BD
+- 🚀 Eficiencia: Constante por operación
+- 📈 Escalabilidad: Ilimitada
+"""
+# Historial de batches (ver StatisticsEngine.update_batch): precios por batch en float32,
+# el promedio acumulado en float64 porque se muestra con 4 decimales
+_BATCH_COLUMNS = [
+    'batch_number', 'batch_id', 'source_file', 'rows_processed', 'batch_min', 'batch_max', 'batch_avg',
+    'running_count_before', 'running_count_after', 'running_avg_after', 'processed_at'
+]
+_BATCH_DTYPES = {
+    'rows_processed': 'int32',
+    'batch_min': 'float32',
+    'batch_max': 'float32',
+    'batch_avg': 'float32',
+    'running_count_before': 'int64',
+    'running_count_after': 'int64',
+    'running_avg_after': 'float64'
+}
+# Columnas del historial de validation → encabezados de la tabla
+_VALIDATION_BATCH_COLUMNS = {
+    'rows_processed': 'Filas',
+    'batch_min': 'Min Precio',
+    'batch_max': 'Max Precio',
+    'batch_avg': 'Avg Precio',
+    'running_count_before': 'Count Antes',
+    'running_count_after': 'Count Después',
+    'running_avg_after': 'Avg Acumulado',
+    'processed_at': 'Procesado'
+}
+_VALIDATION_BATCH_FORMAT = {
+    'Filas': '{:,.0f}',
+    'Min Precio': '${:.2f}',
+    'Max Precio': '${:.2f}',
+    'Avg Precio': '${:.2f}',
+    'Count Antes': '{:,.0f}',
+    'Count Después': '{:,.0f}',
+    'Avg Acumulado': '${:.4f}'
+}
+# Los precios se muestran con 4 decimales: las comparaciones se hacen en enteros de 1/10000
+_PRICE_SCALE = 10_000
+# Ejecución de validation: tamaño de micro-batch y líneas de log que marcan el progreso
+_VALIDATION_BATCH_SIZE = 1000
+_LOADED_ROWS_RE = re.compile(r"Archivo cargado: ([\d,]+) filas")
+_MICRO_BATCH_RE = re.compile(r"Micro-batch (\d+):")
 
 st.set_page_config(page_title="Pragma Challenge", page_icon="🧪", layout="wide")
 
+@dataclass(frozen=True, slots=True)
+class Stats:
+    """count/avg/min/max/sum con esquema fijo (los helpers cacheados devuelven dicts serializables)"""
+    count: int = 0
+    avg: float = 0.0
+    min: float = 0.0
+    max: float = 0.0
+    sum: float = 0.0
+    
+    @classmethod
+    def from_mapping(cls, data):
+        """Construye desde un dict de estadísticas; None y claves ausentes valen 0"""
+        return cls(
+            count=int(data.get('count') or 0),
+            avg=float(data.get('avg') or 0.0),
+            min=float(data.get('min') or 0.0),
+            max=float(data.get('max') or 0.0),
+            sum=float(data.get('sum') or 0.0)
+        )
+
 def main():
     st.title("🧪 Verificación del Reto Técnico")
     st.markdown("**Cumplimiento exacto del Punto 3: Comprobación de resultados**")
     st.markdown("---")
     
-    # Estado del sistema
+    # Estado del sistema (conteo O(1) desde transactions_agg)
     system_status = check_system_status()
     
     if not system_status['pipeline_ready']:
@@ -41,6 +180,12 @@ def main():
             st.switch_page("pages/02_🚀_pipeline_control.py")
         return
     
+    # Un solo fetch de agregados y de estadísticas por rerun, compartidos por todas las secciones.
+    # Por defecto salen de transactions_agg (O(1)); el scan completo de transactions solo a pedido
+    full_scan = st.toggle("🔍 Verificar contra BD (scan completo de transactions)", key="verify_full_scan")
+    db_agg = get_db_aggregates(full_scan)
+    full_stats = load_full_statistics_data()
+    
     # Mostrar estado actual
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -56,35 +201,78 @@ def main():
     # Crear secciones según el reto
     st.markdown("## 📋 Verificaciones del Reto")
     
-    # SECCIÓN 1: Estadísticas en ejecución
-    with st.container():
-        st.markdown("### 1️⃣ Estadísticas en Ejecución")
-        st.markdown("*Requerimiento: Imprime el valor actual de las estadísticas en ejecución*")
-        show_running_statistics_detailed()
+    # Cada sección es un fragment: sus widgets solo rerunean esa sección
+    section_running_stats(full_stats)
     
     st.markdown("---")
     
-    # SECCIÓN 2: Consulta BD inicial
-    with st.container():
-        st.markdown("### 2️⃣ Consulta Base de Datos (Antes de Validation)")
-        st.markdown("*Requerimiento: Consulta BD del recuento total, promedio, mínimo y máximo*")
-        show_database_query_initial()
+    section_db_initial(db_agg)
     
     st.markdown("---")
     
-    # SECCIÓN 3: Ejecutar validation.csv
-    with st.container():
-        st.markdown("### 3️⃣ Ejecutar Validation.csv")
-        st.markdown("*Requerimiento: Ejecuta validation.csv y muestra estadísticas en ejecución*")
-        handle_validation_execution()
+    # Estado de validation resuelto una vez en check_system_status y compartido por las secciones 3 y 4
+    validation_processed = system_status['validation_processed']
+    section_validation_exec(full_stats.get('batch_history', []), validation_processed)
     
     st.markdown("---")
     
-    # SECCIÓN 4: Consulta BD después de validation
-    with st.container():
-        st.markdown("### 4️⃣ Consulta Base de Datos (Después de Validation)")
-        st.markdown("*Requerimiento: Nueva consulta BD después de cargar validation.csv*")
-        show_database_query_after_validation()
+    section_db_after(db_agg, validation_processed)
+    
+    # Aciertos/fallos de los helpers cacheados en esta sesión
+    cache_stats = get_cache_stats()
+    if cache_stats:
+        with st.sidebar.expander("⏱️ Caché de la página"):
+            st.dataframe(pd.DataFrame(cache_stats).T, use_container_width=True)
+
+@st.fragment
+def section_running_stats(full_stats):
+    """SECCIÓN 1: Estadísticas en ejecución"""
+    st.markdown("### 1️⃣ Estadísticas en Ejecución")
+    st.markdown("*Requerimiento: Imprime el valor actual de las estadísticas en ejecución*")
+    show_running_statistics_detailed(full_stats)
+
+@st.fragment
+def section_db_initial(db_agg):
+    """SECCIÓN 2: Consulta BD inicial"""
+    st.markdown("### 2️⃣ Consulta Base de Datos (Antes de Validation)")
+    st.markdown("*Requerimiento: Consulta BD del recuento total, promedio, mínimo y máximo*")
+    show_database_query_initial(db_agg)
+
+@st.fragment
+def section_validation_exec(batch_history, validation_processed):
+    """SECCIÓN 3: Ejecutar validation.csv (st.rerun() dentro recarga toda la app)"""
+    st.markdown("### 3️⃣ Ejecutar Validation.csv")
+    st.markdown("*Requerimiento: Ejecuta validation.csv y muestra estadísticas en ejecución*")
+    handle_validation_execution(batch_history, validation_processed)
+
+@st.fragment
+def section_db_after(db_agg, validation_processed):
+    """SECCIÓN 4: Consulta BD después de validation"""
+    st.markdown("### 4️⃣ Consulta Base de Datos (Después de Validation)")
+    st.markdown("*Requerimiento: Nueva consulta BD después de cargar validation.csv*")
+    show_database_query_after_validation(db_agg, validation_processed)
+
+def get_db_aggregates(full_scan=False):
+    """Agregados de transactions para este rerun (None si no hay BD)"""
+    if not DB_PATH.exists():
+        return None
+    
+    query = _query_agg if full_scan else _query_agg_table
+    agg = Stats.from_mapping(query(str(DB_PATH), sqlite_mtime(DB_PATH)))
+    st.session_state["db_agg"] = agg
+    return agg
+
+def get_row_count():
+    """Filas de transactions desde transactions_agg (una búsqueda por PK); BDs sin la tabla usan COUNT(*)"""
+    if not DB_PATH.exists():
+        return 0
+    
+    db_path_str, db_mtime = str(DB_PATH), sqlite_mtime(DB_PATH)
+    try:
+        return _run_agg_query(db_path_str, db_mtime, _ROW_COUNT_SQL)[0]
+    except (sqlite3.OperationalError, TypeError):
+        # Sin tabla (OperationalError) o sin su fila (fetchone() → None)
+        return _run_agg_query(db_path_str, db_mtime, _TOTAL_COUNT_SQL)[0]
 
 def check_system_status():
     """Verifica el estado del sistema completo"""
@@ -97,55 +285,118 @@ def check_system_status():
     }
     
     try:
-        # Verificar BD
-        db_path = PROJECT_ROOT / "data" / "pipeline.db"
-        if db_path.exists():
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.execute("SELECT COUNT(*) FROM transactions")
-            status['db_records'] = cursor.fetchone()[0]
-            conn.close()
+        # Verificar BD: sin registros no hay nada más que comprobar
+        status['db_records'] = get_row_count()
+        if status['db_records'] == 0:
+            return status
+        
+        # Verificar estadísticas
+        status['stats_available'] = STATS_PATH.exists()
+        if not status['stats_available']:
+            return status
+        
+        # Pipeline está listo si hay datos en BD y estadísticas
+        status['pipeline_ready'] = True
         
-        # Verificar archivos Bronze
+        # Lo siguiente solo se muestra con el pipeline listo
         bronze_path = PROJECT_ROOT / "data" / "processed" / "bronze"
         if bronze_path.exists():
-            status['bronze_files'] = len(list(bronze_path.glob("*.parquet")))
-        
-        # Verificar estadísticas
-        stats_path = PROJECT_ROOT / "data" / "processed" / "pipeline_statistics.json"
-        status['stats_available'] = stats_path.exists()
+            # scandir: DirEntry sin construir un Path por archivo
+            with os.scandir(bronze_path) as entries:
+                status['bronze_files'] = sum(1 for e in entries if e.name.endswith('.parquet'))
         
         # Verificar si validation fue procesado
         status['validation_processed'] = check_validation_in_db()
         
-        # Pipeline está listo si hay datos en BD y estadísticas
-        status['pipeline_ready'] = status['db_records'] > 0 and status['stats_available']
-        
     except Exception as e:
         st.error(f"Error verificando sistema: {e}")
     
     return status
 
+def _cache_entry(name):
+    """Contadores de un helper cacheado en st.session_state["_cache_stats"]"""
+    return st.session_state.setdefault("_cache_stats", {}).setdefault(
+        name, {"calls": 0, "executions": 0, "total_ms": 0.0}
+    )
+
+def _tracked(func):
+    """Encima de st.cache_*: cuenta llamadas y tiempo total de un helper cacheado"""
+    name = func.__name__
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        entry = _cache_entry(name)
+        entry["calls"] += 1
+        entry["total_ms"] += (time.perf_counter() - start) * 1000
+        return result
+    
+    return wrapper
+
+def _executed(func):
+    """Debajo de st.cache_*: solo corre cuando la caché no tiene el resultado (un fallo real)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _cache_entry(func.__name__)["executions"] += 1
+        return func(*args, **kwargs)
+    
+    return wrapper
+
+def get_cache_stats():
+    """hits/misses/total_ms por helper cacheado durante la sesión (misses = ejecuciones del cuerpo)"""
+    return {
+        name: {
+            "hits": entry["calls"] - entry["executions"],
+            "misses": entry["executions"],
+            "total_ms": entry["total_ms"]
+        }
+        for name, entry in st.session_state.get("_cache_stats", {}).items()
+    }
+
+@_tracked
+@st.cache_resource(max_entries=2, show_spinner=False)
+@_executed
+def get_conn(db_path_str, db_ino):
+    """Conexión de solo lectura compartida entre reruns (el inode la renueva si la BD se recrea)"""
+    # Autocommit: las lecturas no dejan una transacción implícita abierta entre reruns
+    conn = connect_sqlite_readonly(db_path_str, isolation_level=None)
+    conn.execute("PRAGMA query_only=1")
+    # Acceso por nombre de columna en los resultados
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def _conn(db_path):
+    """Conexión cacheada para la BD indicada"""
+    return get_conn(str(db_path), Path(db_path).stat().st_ino)
+
+def load_validation_checkpoint():
+    """Checkpoint escrito por el pipeline tras validation.csv (None si no existe)"""
+    try:
+        stat = VALIDATION_DONE_PATH.stat()
+    except FileNotFoundError:
+        return None
+    return _load_json(str(VALIDATION_DONE_PATH), stat.st_mtime_ns, stat.st_size)
+
 def check_validation_in_db():
-    """Verifica si validation.csv ya fue procesado verificando la BD"""
+    """Verifica si validation.csv ya fue procesado (checkpoint del pipeline o, si falta, la BD)"""
     try:
         db_path = PROJECT_ROOT / "data" / "pipeline.db"
         if not db_path.exists():
             return False
         
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.execute("SELECT COUNT(*) FROM transactions WHERE source_file LIKE '%validation%'")
-        validation_records = cursor.fetchone()[0]
-        conn.close()
+        if load_validation_checkpoint() is not None:
+            return True
         
-        return validation_records > 0
-    except:
+        # Ejecuciones anteriores al checkpoint: se busca en la BD
+        return bool(_run_agg_query(str(db_path), sqlite_mtime(db_path), _VALIDATION_EXISTS_SQL)[0])
+    except (OSError, ValueError, sqlite3.DatabaseError) as e:
+        # ValueError cubre el JSONDecodeError de un checkpoint escrito a medias
+        logger.warning("No se pudo verificar el estado de validation", exc_info=e)
         return False
 
-def show_running_statistics_detailed():
+def show_running_statistics_detailed(full_stats_data):
     """Muestra estadísticas en ejecución con detalles de batches"""
-    # Cargar datos completos del archivo
-    full_stats_data = load_full_statistics_data()
-    
     if not full_stats_data:
         st.error("❌ No se encontraron estadísticas incrementales")
         st.info("Las estadísticas se generan durante la ejecución del pipeline")
@@ -155,6 +406,7 @@ def show_running_statistics_detailed():
     batch_history = full_stats_data.get('batch_history', [])
     
     st.success("✅ Estadísticas incrementales disponibles")
+    vals = _running_stats_strings(stats_data)
     
     # Métricas principales
     col1, col2, col3, col4 = st.columns(4)
@@ -162,28 +414,28 @@ def show_running_statistics_detailed():
     with col1:
         st.metric(
             label="📊 Total Registros",
-            value=f"{stats_data.get('count', 0):,}",
+            value=vals['count'],
             help="Contador incremental O(1)"
         )
     
     with col2:
         st.metric(
             label="💰 Precio Promedio",
-            value=f"${stats_data.get('avg', 0):.4f}",
+            value=vals['avg'],
             help="Promedio calculado incrementalmente"
         )
     
     with col3:
         st.metric(
             label="📉 Precio Mínimo",
-            value=f"${stats_data.get('min', 0):.4f}",
+            value=vals['min'],
             help="Mínimo encontrado durante procesamiento"
         )
     
     with col4:
         st.metric(
             label="📈 Precio Máximo",
-            value=f"${stats_data.get('max', 0):.4f}",
+            value=vals['max'],
             help="Máximo encontrado durante procesamiento"
         )
     
@@ -193,127 +445,24 @@ def show_running_statistics_detailed():
     with col_info1:
         st.info(f"""
         **📊 Estadísticas Detalladas:**
-        - 💎 Suma Total: ${stats_data.get('sum', 0):,.4f}
+        - 💎 Suma Total: {vals['sum']}
         - 📦 Batches Procesados: {len(batch_history)}
         - 🕐 Última Actualización: {stats_data.get('last_updated', 'N/A')}
         - 📅 Creado: {stats_data.get('created_at', 'N/A')}
         """)
     
     with col_info2:
-        st.success(f"""
-        **⚡ Información Técnica:**
-        - 🔄 Método: Estadísticas Incrementales O(1)
-        - ✅ Ventaja: NO recalcula desde BD
-        - 🚀 Eficiencia: Constante por operación
-        - 📈 Escalabilidad: Ilimitada
-        """)
+        st.success(_METHOD_INFO_MD)
     
     # Mostrar historial de batches detallado
     if batch_history:
         st.markdown("#### 📦 Historial Detallado de Micro-batches")
         st.write(f"**Total de micro-batches procesados:** {len(batch_history)}")
         
-        # Crear DataFrame con toda la información
-        df_batches = pd.DataFrame(batch_history)
-        
-        if not df_batches.empty:
-            # Agregar índice secuencial para mejor identificación
-            df_batches['ID'] = range(1, len(df_batches) + 1)
-            
-            # Formatear columnas para mejor visualización
-            df_display = df_batches.copy()
-            
-            # Formatear precios
-            for col in ['batch_min', 'batch_max', 'batch_avg', 'running_avg_after']:
-                if col in df_display.columns:
-                    df_display[col] = df_display[col].apply(lambda x: f"${x:.2f}" if pd.notna(x) else "N/A")
-            
-            # Formatear timestamps
-            if 'processed_at' in df_display.columns:
-                df_display['processed_at'] = pd.to_datetime(df_display['processed_at']).dt.strftime('%H:%M:%S')
-            
-            # Renombrar columnas
-            column_mapping = {
-                'ID': 'ID',
-                'source_file': 'Archivo',
-                'rows_processed': 'Filas',
-                'batch_min': 'Min Batch',
-                'batch_max': 'Max Batch',
-                'batch_avg': 'Avg Batch',
-                'running_count_before': 'Count Antes',
-                'running_count_after': 'Count Después',
-                'running_avg_after': 'Avg Acumulado',
-                'processed_at': 'Hora',
-                'batch_id': 'Batch ID'
-            }
-            
-            # Seleccionar y renombrar columnas disponibles
-            available_columns = ['ID', 'source_file', 'rows_processed', 'batch_min', 'batch_max', 'batch_avg', 
-                               'running_count_before', 'running_count_after', 'running_avg_after', 'processed_at']
-            display_columns = [col for col in available_columns if col in df_display.columns]
-            
-            df_final = df_display[display_columns].rename(columns=column_mapping)
-            
-            # Mostrar tabla con configuración mejorada
-            st.dataframe(
-                df_final,
-                use_container_width=True,
-                height=400,
-                hide_index=True
-            )
-            
-            # Análisis de los batches
-            st.markdown("#### 📊 Análisis de Batches")
-            
-            col_analysis1, col_analysis2, col_analysis3, col_analysis4 = st.columns(4)
-            
-            with col_analysis1:
-                avg_batch_size = df_batches['rows_processed'].mean()
-                st.metric("📊 Tamaño Promedio Batch", f"{avg_batch_size:.1f} filas")
-            
-            with col_analysis2:
-                unique_files = df_batches['source_file'].nunique()
-                st.metric("📄 Archivos Únicos", unique_files)
-            
-            with col_analysis3:
-                total_rows = df_batches['rows_processed'].sum()
-                st.metric("📊 Total Filas Procesadas", f"{total_rows:,}")
-            
-            with col_analysis4:
-                avg_processing_time = "< 1s"  # Estimación basada en timestamps
-                st.metric("⏱️ Tiempo Promedio/Batch", avg_processing_time)
-            
-            # Mostrar detalles por archivo
-            st.markdown("#### 📄 Resumen por Archivo")
-            
-            file_summary = df_batches.groupby('source_file').agg({
-                'rows_processed': ['sum', 'count'],
-                'batch_min': 'min',
-                'batch_max': 'max',
-                'batch_avg': 'mean'
-            }).round(2)
-            
-            # Aplanar columnas multinivel
-            file_summary.columns = ['Total_Filas', 'Num_Batches', 'Min_Global', 'Max_Global', 'Avg_Global']
-            file_summary = file_summary.reset_index()
-            
-            # Formatear precios
-            for col in ['Min_Global', 'Max_Global', 'Avg_Global']:
-                file_summary[col] = file_summary[col].apply(lambda x: f"${x:.2f}")
-            
-            st.dataframe(file_summary, use_container_width=True)
-            
-            # Detectar ejecuciones múltiples
-            if len(df_batches) > 6:  # Más de 6 archivos indica ejecuciones múltiples
-                st.warning("⚠️ Se detectaron ejecuciones múltiples del pipeline")
-                
-                # Agrupar por timestamp para identificar ejecuciones
-                df_batches['execution_time'] = pd.to_datetime(df_batches['processed_at']).dt.floor('Min')
-                executions = df_batches.groupby('execution_time').size()
-                
-                st.write(f"**Número de ejecuciones detectadas:** {len(executions)}")
-                for i, (exec_time, count) in enumerate(executions.items(), 1):
-                    st.write(f"- Ejecución {i}: {exec_time.strftime('%H:%M')} ({count} batches)")
+        # El DataFrame y sus agregados solo se construyen a pedido
+        if st.toggle("Mostrar historial detallado", key="show_batch_detail"):
+            stat = STATS_PATH.stat()
+            show_batch_history(_batch_frame(stat.st_mtime_ns, stat.st_size))
     
     else:
         st.warning("⚠️ No se encontró historial de batches")
@@ -323,38 +472,131 @@ def show_running_statistics_detailed():
     with st.expander("🔍 Ver datos completos de estadísticas (JSON)"):
         st.json(full_stats_data)
 
-def show_database_query_initial():
+def show_batch_history(df_batches):
+    """Tabla, análisis y resumen por archivo del historial de micro-batches"""
+    if df_batches.empty:
+        return
+    
+    # Agregar índice secuencial para mejor identificación
+    df_batches['ID'] = range(1, len(df_batches) + 1)
+    
+    # Renombrar columnas
+    column_mapping = {
+        'ID': 'ID',
+        'source_file': 'Archivo',
+        'rows_processed': 'Filas',
+        'batch_min': 'Min Batch',
+        'batch_max': 'Max Batch',
+        'batch_avg': 'Avg Batch',
+        'running_count_before': 'Count Antes',
+        'running_count_after': 'Count Después',
+        'running_avg_after': 'Avg Acumulado',
+        'processed_at': 'Hora',
+        'batch_id': 'Batch ID'
+    }
+    
+    # Seleccionar y renombrar columnas disponibles
+    available_columns = ['ID', 'source_file', 'rows_processed', 'batch_min', 'batch_max', 'batch_avg', 
+                       'running_count_before', 'running_count_after', 'running_avg_after', 'processed_at']
+    display_columns = [col for col in available_columns if col in df_batches.columns]
+    
+    df_final = df_batches[display_columns].rename(columns=column_mapping)
+    
+    # Formatear timestamps: processed_at es isoformat(), HH:MM:SS ocupa las posiciones 11-19
+    if 'Hora' in df_final.columns:
+        df_final['Hora'] = df_final['Hora'].str.slice(11, 19)
+    
+    # Precios formateados por el Styler al renderizar (sin apply por celda)
+    price_format = {
+        col: "${:.2f}" for col in ('Min Batch', 'Max Batch', 'Avg Batch', 'Avg Acumulado')
+        if col in df_final.columns
+    }
+    
+    # Mostrar tabla con configuración mejorada
+    st.dataframe(
+        df_final.style.format(price_format, na_rep="N/A"),
+        use_container_width=True,
+        height=400,
+        hide_index=True
+    )
+    
+    # Análisis de los batches
+    st.markdown("#### 📊 Análisis de Batches")
+    
+    col_analysis1, col_analysis2, col_analysis3, col_analysis4 = st.columns(4)
+    
+    with col_analysis1:
+        avg_batch_size = df_batches['rows_processed'].mean()
+        st.metric("📊 Tamaño Promedio Batch", f"{avg_batch_size:.1f} filas")
+    
+    with col_analysis2:
+        unique_files = df_batches['source_file'].nunique()
+        st.metric("📄 Archivos Únicos", unique_files)
+    
+    with col_analysis3:
+        total_rows = df_batches['rows_processed'].sum()
+        st.metric("📊 Total Filas Procesadas", f"{total_rows:,}")
+    
+    with col_analysis4:
+        avg_processing_time = "< 1s"  # Estimación basada en timestamps
+        st.metric("⏱️ Tiempo Promedio/Batch", avg_processing_time)
+    
+    # Mostrar detalles por archivo
+    st.markdown("#### 📄 Resumen por Archivo")
+    
+    # Agregado por archivo en SQLite (GROUP BY sobre idx_source_file), cacheado por mtime de la BD
+    file_summary = pd.DataFrame(
+        _query_file_summary(str(DB_PATH), sqlite_mtime(DB_PATH)),
+        columns=['source_file', 'Total_Filas', 'Num_Batches', 'Min_Global', 'Max_Global', 'Avg_Global']
+    )
+    
+    st.dataframe(
+        file_summary.style.format("${:.2f}", subset=['Min_Global', 'Max_Global', 'Avg_Global']),
+        use_container_width=True
+    )
+    
+    # Detectar ejecuciones múltiples
+    if len(df_batches) > 6:  # Más de 6 archivos indica ejecuciones múltiples
+        st.warning("⚠️ Se detectaron ejecuciones múltiples del pipeline")
+    
+        # Agrupar por minuto: el prefijo ISO 'YYYY-MM-DDTHH:MM' ordena cronológicamente sin parsear fechas
+        executions = df_batches['processed_at'].str.slice(0, 16).value_counts().sort_index()
+        
+        st.write(f"**Número de ejecuciones detectadas:** {len(executions)}")
+        for i, (exec_time, count) in enumerate(executions.items(), 1):
+            st.write(f"- Ejecución {i}: {exec_time[11:]} ({count} batches)")
+
+def show_database_query_initial(db_agg):
     """Muestra consulta inicial a la base de datos"""
     try:
-        db_path = PROJECT_ROOT / "data" / "pipeline.db"
+        db_path = DB_PATH
         
-        if not db_path.exists():
+        if db_agg is None:
             st.error("❌ Base de datos no encontrada")
             return
         
         # Obtener timestamp del archivo de BD para mostrar estado
-        db_modified = datetime.fromtimestamp(db_path.stat().st_mtime)
+        db_modified = datetime.fromtimestamp(sqlite_mtime(db_path))
         st.info(f"📅 Base de datos última modificación: {db_modified.strftime('%Y-%m-%d %H:%M:%S')}")
         
-        # Ejecutar consulta principal
-        conn = sqlite3.connect(str(db_path))
-        
-        query = """
-        SELECT 
-            COUNT(*) as total_records,
-            AVG(price) as average_price,
-            MIN(price) as minimum_price,
-            MAX(price) as maximum_price,
-            SUM(price) as total_sum
-        FROM transactions
-        """
-        
-        st.code(query, language="sql")
+        # Resultado de la consulta principal (compartido con el resto de la página)
+        full_scan = st.session_state.get("verify_full_scan", False)
+        st.code(_AGG_SQL if full_scan else _AGG_TABLE_SQL, language="sql")
+        
+        if full_scan:
+            # El scan completo se contrasta con la fila mantenida por triggers
+            table_agg = get_database_statistics()
+            if table_agg is not None:
+                scan_values = np.array(astuple(db_agg)[:4], dtype=float)
+                table_values = np.array(astuple(table_agg)[:4], dtype=float)
+                if np.array_equal(_quantize(scan_values), _quantize(table_values)):
+                    st.success("✅ El scan completo coincide con transactions_agg")
+                else:
+                    st.warning("⚠️ El scan completo no coincide con transactions_agg")
         
-        cursor = conn.execute(query)
-        result = cursor.fetchone()
+        vals = _format_stats(db_agg)
         
-        if result and result[0] > 0:
+        if db_agg.count > 0:
             st.success("✅ Consulta ejecutada exitosamente")
             
             # Mostrar resultados principales
@@ -363,82 +605,66 @@ def show_database_query_initial():
             with col1:
                 st.metric(
                     label="🗄️ COUNT(*)",
-                    value=f"{result[0]:,}",
+                    value=vals['count'],
                     help="Recuento total de filas"
                 )
             
             with col2:
                 st.metric(
                     label="💰 AVG(price)",
-                    value=f"${result[1]:.4f}" if result[1] else "$0.0000",
+                    value=vals['avg'],
                     help="Valor promedio del campo price"
                 )
             
             with col3:
                 st.metric(
                     label="📉 MIN(price)",
-                    value=f"${result[2]:.4f}" if result[2] else "$0.0000", 
+                    value=vals['min'],
                     help="Valor mínimo del campo price"
                 )
             
             with col4:
                 st.metric(
                     label="📈 MAX(price)",
-                    value=f"${result[3]:.4f}" if result[3] else "$0.0000",
+                    value=vals['max'],
                     help="Valor máximo del campo price"
                 )
             
             # Información adicional
-            st.info(f"💎 **Suma Total**: ${result[4]:,.4f}" if result[4] else "$0.0000")
+            st.info(f"💎 **Suma Total**: {vals['sum']}")
             
             # Consultas adicionales para más contexto
             st.markdown("#### 📊 Información Adicional de la Base de Datos")
             
-            additional_queries = {
-                "👥 Usuarios únicos": "SELECT COUNT(DISTINCT user_id) FROM transactions",
-                "📄 Archivos procesados": "SELECT COUNT(DISTINCT source_file) FROM transactions", 
-                "📦 Batches únicos": "SELECT COUNT(DISTINCT batch_id) FROM transactions WHERE batch_id IS NOT NULL"
-            }
-            
-            col_add1, col_add2, col_add3 = st.columns(3)
-            
-            for i, (label, query) in enumerate(additional_queries.items()):
-                cursor = conn.execute(query)
-                additional_result = cursor.fetchone()[0]
+            # Los COUNT(DISTINCT) recorren índices completos: solo se consultan si el usuario los pide
+            if st.toggle("Mostrar información adicional", key="show_extras"):
+                extras = _run_agg_query(str(db_path), sqlite_mtime(db_path), _DISTINCTS_SQL)
                 
-                if i == 0:
-                    col_add1.metric(label, f"{additional_result:,}")
-                elif i == 1:
-                    col_add2.metric(label, f"{additional_result:,}")
-                else:
-                    col_add3.metric(label, f"{additional_result:,}")
+                for column, label, value in zip(st.columns(3), _DISTINCT_LABELS, extras):
+                    column.metric(label, f"{value:,}")
         
         # Guardar estado antes de validation para comparación
         if 'db_state_before_validation' not in st.session_state:
             st.session_state.db_state_before_validation = {
-                'count': result[0] if result else 0,
-                'avg': result[1] if result else 0.0,
-                'min': result[2] if result else 0.0,
-                'max': result[3] if result else 0.0,
-                'sum': result[4] if result else 0.0,
+                'count': db_agg.count,
+                'avg': db_agg.avg,
+                'min': db_agg.min,
+                'max': db_agg.max,
+                'sum': db_agg.sum,
                 'timestamp': datetime.now().isoformat()
             }
         
-        conn.close()
-        
     except Exception as e:
         st.error(f"❌ Error ejecutando consulta: {str(e)}")
 
-def handle_validation_execution():
+def handle_validation_execution(batch_history, validation_processed):
     """Maneja la ejecución de validation.csv"""
-    validation_processed = check_validation_in_db()
-    
     if validation_processed:
         st.success("✅ Validation.csv ya fue procesado")
         st.info("Los datos de validation.csv ya están incluidos en las estadísticas actuales")
         
         # Mostrar información sobre validation
-        show_validation_info()
+        show_validation_info(batch_history)
         
     else:
         st.warning("⚠️ Validation.csv aún no ha sido procesado")
@@ -453,54 +679,38 @@ def handle_validation_execution():
             if st.button("🚀 Ejecutar Pipeline Completo", use_container_width=True):
                 st.switch_page("pages/02_🚀_pipeline_control.py")
 
-def show_validation_info():
+def show_validation_info(batch_history):
     """Muestra información específica sobre validation.csv"""
     try:
         # Información desde BD
-        db_path = PROJECT_ROOT / "data" / "pipeline.db"
-        conn = sqlite3.connect(str(db_path))
+        db_mtime = sqlite_mtime(DB_PATH)
         
         # Consulta específica para validation.csv
-        validation_query = """
-        SELECT 
-            COUNT(*) as validation_records,
-            AVG(price) as validation_avg,
-            MIN(price) as validation_min,
-            MAX(price) as validation_max,
-            SUM(price) as validation_sum
-        FROM transactions 
-        WHERE source_file LIKE '%validation%'
-        """
-        
-        cursor = conn.execute(validation_query)
-        val_result = cursor.fetchone()
+        val_records, val_avg, val_min, val_max = _run_agg_query(
+            str(DB_PATH), db_mtime, _VALIDATION_AGG_SQL
+        )
+        total_records = get_row_count()
         
-        if val_result and val_result[0] > 0:
+        if val_records and val_records > 0:
             st.markdown("#### 🧪 Datos específicos de Validation.csv en BD")
             
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("📊 Filas Validation", f"{val_result[0]:,}")
+                st.metric("📊 Filas Validation", f"{val_records:,}")
             with col2:
-                st.metric("💰 Avg Validation", f"${val_result[1]:.4f}")
+                st.metric("💰 Avg Validation", f"${val_avg:.4f}")
             with col3:
-                st.metric("📉 Min Validation", f"${val_result[2]:.4f}")
+                st.metric("📉 Min Validation", f"${val_min:.4f}")
             with col4:
-                st.metric("📈 Max Validation", f"${val_result[3]:.4f}")
+                st.metric("📈 Max Validation", f"${val_max:.4f}")
             
             # Mostrar porcentaje que representa validation del total
-            cursor = conn.execute("SELECT COUNT(*) FROM transactions")
-            total_records = cursor.fetchone()[0]
-            
-            validation_percentage = (val_result[0] / total_records) * 100 if total_records > 0 else 0
+            validation_percentage = (val_records / total_records) * 100 if total_records > 0 else 0
             
             st.info(f"📊 Validation.csv representa el **{validation_percentage:.2f}%** del total de datos")
         
-        conn.close()
-        
-        # Información desde batch_history
-        batch_history = load_batch_history()
+        # Información desde batch_history (leído una vez en main)
         validation_batches = [batch for batch in batch_history if 'validation' in batch.get('source_file', '').lower()]
         
         if validation_batches:
@@ -508,21 +718,15 @@ def show_validation_info():
             
             st.write(f"**Número de batches de validation:** {len(validation_batches)}")
             
-            for i, batch in enumerate(validation_batches, 1):
-                with st.expander(f"Batch {i} de Validation - {batch.get('rows_processed', 0)} filas"):
-                    col_val1, col_val2 = st.columns(2)
-                    
-                    with col_val1:
-                        st.write(f"**Filas procesadas:** {batch.get('rows_processed', 0)}")
-                        st.write(f"**Min precio:** ${batch.get('batch_min', 0):.2f}")
-                        st.write(f"**Max precio:** ${batch.get('batch_max', 0):.2f}")
-                        st.write(f"**Avg precio:** ${batch.get('batch_avg', 0):.2f}")
-                    
-                    with col_val2:
-                        st.write(f"**Count antes:** {batch.get('running_count_before', 0):,}")
-                        st.write(f"**Count después:** {batch.get('running_count_after', 0):,}")
-                        st.write(f"**Avg acumulado:** ${batch.get('running_avg_after', 0):.4f}")
-                        st.write(f"**Procesado:** {batch.get('processed_at', 'N/A')}")
+            # Una sola tabla en lugar de un expander por batch
+            df_val = pd.DataFrame(validation_batches).reindex(columns=list(_VALIDATION_BATCH_COLUMNS))
+            df_val = df_val.rename(columns=_VALIDATION_BATCH_COLUMNS)
+            df_val.index = pd.RangeIndex(1, len(df_val) + 1, name="Batch")
+            
+            st.dataframe(
+                df_val.style.format(_VALIDATION_BATCH_FORMAT, na_rep="N/A"),
+                use_container_width=True
+            )
         
     except Exception as e:
         st.error(f"Error consultando validation: {e}")
@@ -544,128 +748,110 @@ def execute_validation_only():
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            # Preparar comando para ejecutar solo validation
+            # Ejecutar solo validation a través del pipeline de ingesta
             cmd = [
                 "python3",
                 str(PROJECT_ROOT / "src" / "pipeline" / "data_ingestion.py"),
-                "--validation-only"  # Necesitarías agregar esta opción al script
+                "--validation-only",
+                "--batch-size", str(_VALIDATION_BATCH_SIZE)
             ]
             
             env = os.environ.copy()
             env["PYTHONPATH"] = str(SRC_PATH)
-            
-            # Simular progreso mientras ejecuta
-            for i in range(0, 101, 20):
-                progress_bar.progress(i)
-                if i == 0:
-                    status_text.text("🔄 Inicializando...")
-                elif i == 20:
-                    status_text.text("📖 Leyendo validation.csv...")
-                elif i == 40:
-                    status_text.text("🔄 Procesando micro-batches...")
-                elif i == 60:
-                    status_text.text("💾 Insertando en BD...")
-                elif i == 80:
-                    status_text.text("📊 Actualizando estadísticas...")
-                elif i == 100:
-                    status_text.text("✅ Validación completada")
+            env["PYTHONUNBUFFERED"] = "1"  # los logs deben llegar a medida que ocurren
+            
+            status_text.text("🔄 Inicializando...")
+            output_lines = []
+            total_batches = None
+            
+            # El progreso sale de los logs reales del pipeline, línea a línea
+            with subprocess.Popen(
+                cmd, cwd=str(PROJECT_ROOT), env=env,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
+            ) as proc:
+                for line in proc.stdout:
+                    output_lines.append(line.rstrip('\n'))
+                    
+                    if (match := _LOADED_ROWS_RE.search(line)):
+                        rows = int(match.group(1).replace(',', ''))
+                        total_batches = max(1, -(-rows // _VALIDATION_BATCH_SIZE))
+                        status_text.text(f"📖 validation.parquet: {rows:,} filas")
+                    elif total_batches and (match := _MICRO_BATCH_RE.search(line)):
+                        batch = int(match.group(1))
+                        progress_bar.progress(min(95, batch * 95 // total_batches))
+                        status_text.text(f"💾 Micro-batch {batch}/{total_batches} → BD + estadísticas")
                 
-                time.sleep(0.5)
+                returncode = proc.wait()
             
-            # Aquí ejecutarías el comando real
-            # result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            st.session_state.validation_execution_running = False
+            
+            if returncode != 0:
+                status_text.text("❌ Validation terminó con errores")
+                st.error(f"❌ El pipeline terminó con código {returncode}")
+                st.code("\n".join(output_lines[-15:]), language="bash")
+                return
             
-            # Simular éxito por ahora
+            progress_bar.progress(100)
+            status_text.text("✅ Validación completada")
             st.success("✅ Validation.csv procesado exitosamente!")
-            st.session_state.validation_execution_running = False
             st.rerun()
             
     except Exception as e:
         st.error(f"❌ Error ejecutando validation: {str(e)}")
         st.session_state.validation_execution_running = False
 
-def show_database_query_after_validation():
+def show_database_query_after_validation(db_agg, validation_processed):
     """Muestra consulta a BD después de procesar validation.csv"""
-    validation_processed = check_validation_in_db()
-    
     if not validation_processed:
         st.warning("⚠️ Validation.csv debe ser procesado primero")
         st.info("Una vez que validation.csv sea procesado, aquí verás la comparación antes/después")
         return
     
     try:
-        db_path = PROJECT_ROOT / "data" / "pipeline.db"
-        conn = sqlite3.connect(str(db_path))
-        
         # Consulta actual (después de validation)
-        query_after = """
-        SELECT 
-            COUNT(*) as total_records,
-            AVG(price) as average_price,
-            MIN(price) as minimum_price,
-            MAX(price) as maximum_price,
-            SUM(price) as total_sum
-        FROM transactions
-        """
-        
         st.markdown("#### 🔍 Consulta BD Después de Validation.csv")
-        st.code(query_after, language="sql")
+        st.code(_AGG_SQL if st.session_state.get("verify_full_scan", False) else _AGG_TABLE_SQL, language="sql")
         
-        cursor = conn.execute(query_after)
-        result_after = cursor.fetchone()
+        vals = _format_stats(db_agg)
         
-        if result_after:
+        if db_agg.count > 0:
             st.success("✅ Consulta ejecutada exitosamente")
             
             # Mostrar resultados actuales
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("🗄️ COUNT(*)", f"{result_after[0]:,}")
+                st.metric("🗄️ COUNT(*)", vals['count'])
             with col2:
-                st.metric("💰 AVG(price)", f"${result_after[1]:.4f}")
+                st.metric("💰 AVG(price)", vals['avg'])
             with col3:
-                st.metric("📉 MIN(price)", f"${result_after[2]:.4f}")
+                st.metric("📉 MIN(price)", vals['min'])
             with col4:
-                st.metric("📈 MAX(price)", f"${result_after[3]:.4f}")
+                st.metric("📈 MAX(price)", vals['max'])
             
             # Comparación con estado anterior si está disponible
-            if 'db_state_before_validation' in st.session_state:
+            # El checkpoint del pipeline trae el estado previo real; la sesión es el respaldo
+            checkpoint = load_validation_checkpoint()
+            if checkpoint or 'db_state_before_validation' in st.session_state:
                 st.markdown("#### 📊 Comparación: Antes vs Después de Validation.csv")
                 
-                before = st.session_state.db_state_before_validation
+                before = Stats.from_mapping(
+                    checkpoint['before'] if checkpoint else st.session_state.db_state_before_validation
+                )
                 
-                # Calcular cambios
-                count_change = result_after[0] - before['count']
-                avg_change = result_after[1] - before['avg'] if before['avg'] else result_after[1]
-                min_change = result_after[2] - before['min'] if before['min'] else result_after[2]
-                max_change = result_after[3] - before['max'] if before['max'] else result_after[3]
+                # Calcular cambios de [count, avg, min, max] en una sola operación vectorial
+                after_values = np.array(astuple(db_agg)[:4], dtype=float)
+                before_values = np.array(astuple(before)[:4], dtype=float)
+                changes = after_values - before_values
+                # Signo de cada cambio sobre enteros cuantizados a la precisión mostrada, sin tolerancias
+                direction = np.sign(_quantize(after_values) - _quantize(before_values))
+                unchanged = direction == 0
                 
-                # Tabla de comparación
-                comparison_data = {
-                    "Métrica": ["Recuento Total", "Valor Promedio", "Valor Mínimo", "Valor Máximo"],
-                    "Antes de Validation": [
-                        f"{before['count']:,}",
-                        f"${before['avg']:.4f}",
-                        f"${before['min']:.4f}",
-                        f"${before['max']:.4f}"
-                    ],
-                    "Después de Validation": [
-                        f"{result_after[0]:,}",
-                        f"${result_after[1]:.4f}",
-                        f"${result_after[2]:.4f}",
-                        f"${result_after[3]:.4f}"
-                    ],
-                    "Cambio": [
-                        f"+{count_change:,}" if count_change > 0 else f"{count_change:,}",
-                        f"{avg_change:+.4f}",
-                        f"{min_change:+.4f}" if min_change != result_after[2] else "Sin cambio",
-                        f"{max_change:+.4f}" if max_change != result_after[3] else "Sin cambio"
-                    ]
-                }
+                count_change = int(changes[0])
+                avg_change = float(changes[1])
                 
-                df_comparison = pd.DataFrame(comparison_data)
-                st.dataframe(df_comparison, use_container_width=True)
+                # 16 celdas: markdown prearmado, sin DataFrame ni serialización Arrow
+                st.markdown(_comparison_markdown(before_values, after_values, changes, unchanged))
                 
                 # Resumen de cambios
                 col_change1, col_change2, col_change3 = st.columns(3)
@@ -673,96 +859,158 @@ def show_database_query_after_validation():
                 with col_change1:
                     st.metric(
                         "📈 Filas Añadidas",
-                        f"+{count_change:,}",
-                        delta=f"+{count_change:,}"
+                        f"{count_change:+,}",
+                        delta=f"{count_change:+,}"
                     )
                 
                 with col_change2:
                     st.metric(
                         "💰 Cambio Promedio",
-                        f"${result_after[1]:.4f}",
+                        vals['avg'],
                         delta=f"{avg_change:+.4f}"
                     )
                 
                 with col_change3:
-                    if min_change < 0:
-                        st.metric("📉 Nuevo Mínimo", f"${result_after[2]:.4f}", delta="Nuevo mínimo detectado")
-                    elif max_change > 0:
-                        st.metric("📈 Nuevo Máximo", f"${result_after[3]:.4f}", delta="Nuevo máximo detectado") 
+                    # Misma dirección cuantizada que la columna "Cambio" de la tabla
+                    if direction[2] < 0:
+                        st.metric("📉 Nuevo Mínimo", vals['min'], delta="Nuevo mínimo detectado")
+                    elif direction[3] > 0:
+                        st.metric("📈 Nuevo Máximo", vals['max'], delta="Nuevo máximo detectado") 
                     else:
                         st.metric("📊 Rango", "Sin cambios", delta="Min/Max inalterados")
             
             else:
                 st.info("💡 Para ver la comparación, ejecuta primero la consulta 'Antes de Validation'")
         
-        conn.close()
-        
     except Exception as e:
         st.error(f"❌ Error en consulta después de validation: {str(e)}")
 
+def _comparison_markdown(before_values, after_values, changes, unchanged):
+    """Tabla antes/después de [count, avg, min, max] en markdown; min/max sin cambio se marcan como tal"""
+    lines = [
+        "| Métrica | Antes de Validation | Después de Validation | Cambio |",
+        "|---|---:|---:|---:|",
+        f"| {_COMPARISON_METRICS[0]} | {before_values[0]:,.0f} | {after_values[0]:,.0f} | {changes[0]:+,.0f} |"
+    ]
+    for i, label in enumerate(_COMPARISON_METRICS[1:], 1):
+        change = "Sin cambio" if i >= 2 and unchanged[i] else f"{changes[i]:+.4f}"
+        # \$ escapado: st.markdown interpreta $...$ como LaTeX
+        lines.append(f"| {label} | \\${before_values[i]:.4f} | \\${after_values[i]:.4f} | {change} |")
+    return "\n".join(lines)
+
+def _quantize(values):
+    """Valores a enteros en unidades de _PRICE_SCALE (la precisión que muestra la página)"""
+    return np.rint(values * _PRICE_SCALE).astype(np.int64)
+
+def _running_stats_strings(stats_data):
+    """Cadenas de las métricas incrementales, memorizadas en la sesión por versión del archivo"""
+    version = STATS_PATH.stat().st_mtime_ns
+    cached = st.session_state.get("_running_stats_fmt")
+    if cached is None or cached[0] != version:
+        cached = (version, _format_stats(Stats.from_mapping(stats_data)))
+        st.session_state["_running_stats_fmt"] = cached
+    return cached[1]
+
+def _format_stats(stats):
+    """Textos de count/avg/min/max/sum de un Stats, formateados una sola vez por render"""
+    return {
+        'count': f"{stats.count:,}",
+        'avg': f"${stats.avg:.4f}",
+        'min': f"${stats.min:.4f}",
+        'max': f"${stats.max:.4f}",
+        'sum': f"${stats.sum:,.4f}"
+    }
+
 def load_full_statistics_data():
     """Carga todos los datos de estadísticas (stats + batch_history)"""
     try:
-        stats_path = PROJECT_ROOT / "data" / "processed" / "pipeline_statistics.json"
-        if stats_path.exists():
-            with open(stats_path, 'r') as f:
-                data = json.load(f)
-                return data
+        if STATS_PATH.exists():
+            # mtime_ns y tamaño invalidan la caché en cuanto el pipeline reescribe el archivo
+            stat = STATS_PATH.stat()
+            return _load_json(str(STATS_PATH), stat.st_mtime_ns, stat.st_size)
         return {}
-    except Exception as e:
+    except (OSError, ValueError) as e:
+        logger.warning("No se pudo cargar %s", STATS_PATH, exc_info=e)
         st.error(f"Error cargando datos completos: {e}")
         return {}
 
+@_tracked
+@st.cache_data(ttl=60, show_spinner=False)
+@_executed
+def _load_json(path_str, mtime_ns, size):
+    """JSON cacheado por (ruta, mtime_ns, tamaño); orjson si está instalado"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(Path(path_str).read_bytes())
+        except orjson.JSONDecodeError:
+            pass  # Infinity/NaN (min/max iniciales) solo los admite json estándar
+    with open(path_str, 'r') as f:
+        return json.load(f)
+
+@_tracked
+@st.cache_data(ttl=60, show_spinner=False)
+@_executed
+def _batch_frame(mtime_ns, size):
+    """DataFrame del historial de batches, cacheado por versión del archivo de estadísticas"""
+    batch_history = _load_json(str(STATS_PATH), mtime_ns, size).get('batch_history', [])
+    # Columnar y tipado: sin inferencia de dtype por columna sobre los dicts
+    df = pd.DataFrame.from_records(batch_history, columns=_BATCH_COLUMNS)
+    return df.astype(_BATCH_DTYPES)
+
 def load_incremental_statistics():
     """Carga solo las estadísticas incrementales del archivo"""
-    try:
-        full_data = load_full_statistics_data()
-        return full_data.get('stats', {})
-    except Exception as e:
-        st.error(f"Error cargando estadísticas: {e}")
-        return {}
-
-def load_batch_history():
-    """Carga el historial de batches procesados"""
-    try:
-        full_data = load_full_statistics_data()
-        return full_data.get('batch_history', [])
-    except Exception as e:
-        return []
+    # load_full_statistics_data ya maneja y registra los errores de lectura
+    return load_full_statistics_data().get('stats', {})
 
 def get_database_statistics():
-    """Obtiene estadísticas directas de BD"""
+    """Obtiene estadísticas directas de BD (Stats, o None si no hay datos)"""
     try:
-        db_path = PROJECT_ROOT / "data" / "pipeline.db"
+        db_path = DB_PATH
         if not db_path.exists():
-            return {}
-        
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.execute("""
-            SELECT 
-                COUNT(*) as count,
-                AVG(price) as avg,
-                MIN(price) as min,
-                MAX(price) as max,
-                SUM(price) as sum
-            FROM transactions
-        """)
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result and result[0] > 0:
-            return {
-                'count': result[0],
-                'avg': float(result[1]) if result[1] else 0.0,
-                'min': float(result[2]) if result[2] else 0.0,
-                'max': float(result[3]) if result[3] else 0.0,
-                'sum': float(result[4]) if result[4] else 0.0
-            }
+            return None
         
-        return {}
-    except Exception as e:
+        stats = Stats.from_mapping(_query_agg_table(str(db_path), sqlite_mtime(db_path)))
+        return stats if stats.count > 0 else None
+    except (OSError, sqlite3.DatabaseError) as e:
+        logger.warning("No se pudieron leer los agregados de la BD", exc_info=e)
         st.error(f"Error consultando BD: {e}")
-        return {}
+        return None
+
+@_tracked
+@st.cache_data(ttl=60, show_spinner=False)
+@_executed
+def _run_agg_query(db_path_str, db_mtime, sql):
+    """Fila de una consulta de agregados como tupla, cacheada por (ruta, mtime, SQL)"""
+    return tuple(_conn(db_path_str).execute(sql).fetchone())
+
+@_tracked
+@st.cache_data(ttl=60, show_spinner=False)
+@_executed
+def _query_file_summary(db_path_str, db_mtime):
+    """Filas, batches y precios por source_file"""
+    return [tuple(row) for row in _conn(db_path_str).execute(_FILE_SUMMARY_SQL)]
+
+@_tracked
+@st.cache_data(ttl=60, show_spinner=False)
+@_executed
+def _query_agg(db_path_str, db_mtime):
+    """COUNT/AVG/MIN/MAX/SUM de transactions, cacheado por (ruta, mtime): un scan por escritura de la BD"""
+    row = _conn(db_path_str).execute(_AGG_SQL).fetchone()
+    return dict(zip(('count', 'avg', 'min', 'max', 'sum'), row))
+
+@_tracked
+@st.cache_data(ttl=60, show_spinner=False)
+@_executed
+def _query_agg_table(db_path_str, db_mtime):
+    """Agregados desde transactions_agg; BDs creadas antes de la tabla caen al scan completo"""
+    try:
+        row = _conn(db_path_str).execute(_AGG_TABLE_SQL).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    
+    if row is None:
+        return _query_agg(db_path_str, db_mtime)
+    return dict(zip(('count', 'avg', 'min', 'max', 'sum'), row))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,27 @@
+# test/unit_testing/conftest.py
+"""
+Fixtures compartidas por las pruebas de la capa Bronze
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# El archivo vive en <raíz>/test/unit_testing/, la raíz está dos niveles arriba
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root / "src"))
+
+from data_flow.bronze_converter import BronzeConverter
+
+
+@pytest.fixture(scope="session")
+def converter():
+    """Un solo BronzeConverter para toda la sesión de pruebas"""
+    return BronzeConverter(base_path=str(project_root))
+
+
+@pytest.fixture(scope="session")
+def csv_files(converter):
+    """Archivos CSV de entrada, buscados una sola vez por sesión"""
+    return converter.get_csv_files()
@@ -1,44 +1,19 @@
 # test/unit_testing/test_bronze_converter.py
 """
-Script de prueba para verificar la conversión a la capa Bronze
-Versión corregida con importaciones robustas
+Pruebas de la conversión a la capa Bronze (pytest)
+Las fixtures converter y csv_files se comparten en la sesión desde conftest.py
 """
 
-import sys
 import os
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-# Configurar rutas de forma robusta - funciona desde cualquier ubicación
-current_file = Path(__file__).resolve()
-
-# Buscar la raíz del proyecto (donde está src/)
-project_root = current_file
-while project_root.parent != project_root:
-    if (project_root / "src").exists():
-        break
-    project_root = project_root.parent
-
-if not (project_root / "src").exists():
-    print("❌ Error: No se pudo encontrar la carpeta 'src'. Asegúrate de estar en el proyecto correcto.")
-    sys.exit(1)
-
-# Agregar src al path
-src_path = project_root / "src"
-sys.path.insert(0, str(src_path))
-
-print(f"📁 Proyecto detectado en: {project_root}")
-print(f"📁 Usando src desde: {src_path}")
+import pytest
 
+# Sketch HyperLogLog opcional para contar usuarios únicos con memoria constante
 try:
-    from data_flow.bronze_converter import BronzeConverter
-    from data_flow.utils import setup_logging
-    print("✅ Importaciones exitosas")
-except ImportError as e:
-    print(f"❌ Error importando módulos: {e}")
-    print("Estructura de directorios encontrada:")
-    for item in src_path.iterdir():
-        print(f"  - {item.name}")
-    sys.exit(1)
+    import datasketches
+except ImportError:
+    datasketches = None
 
 # Configurar logging
 import logging
@@ -48,318 +23,340 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def test_bronze_conversion():
+# Compresión mínima esperada de Bronze (zstd) respecto a los CSV originales
+MIN_COMPRESSION_RATIO = 60
+# Solo se exige con entradas grandes: en CSV pequeños el footer Parquet y las columnas
+# de metadatos pesan más que lo que ahorra zstd
+MIN_COMPRESSION_INPUT_BYTES = 8 * 1024 * 1024
+
+# Filas por lote al recorrer un Parquet: la memoria queda acotada sin importar el tamaño del archivo
+PARQUET_BATCH_ROWS = 65_536
+
+# Precisión del sketch HLL (2^14 registros, ~16 KiB, error típico ~1%)
+HLL_LG_K = 14
+
+# Esquema y archivos esperados en Bronze
+_EXPECTED_COLS = frozenset(("timestamp", "price", "user_id", "source_file"))
+_EXPECTED_STEMS = ("2012-1", "2012-2", "2012-3", "2012-4", "2012-5", "validation")
+
+def count_csv_rows(csv_path, chunk_size=1 << 20):
     """
-    Prueba la conversión completa a Bronze
+    Cuenta las filas de datos de un CSV (sin header) leyendo bloques binarios de 1 MiB:
+    bytes.count(b"\\n") evita decodificar y crear un str por línea
     """
-    logger.info("🥉 INICIANDO PRUEBA DE CONVERSIÓN A BRONZE")
-    logger.info("=" * 60)
+    line_count = 0
+    last_chunk = b""
+    with open(csv_path, 'rb', buffering=0) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            line_count += chunk.count(b"\n")
+            last_chunk = chunk
+    
+    # Última línea sin salto de línea final
+    if last_chunk and not last_chunk.endswith(b"\n"):
+        line_count += 1
+    
+    return max(line_count - 1, 0)  # -1 por header
+
+def count_parquet_nulls(parquet_file):
+    """
+    Total de nulos de un Parquet a partir del null_count de las estadísticas del footer;
+    solo se lee un column chunk si no trae estadísticas
+    """
+    metadata = parquet_file.metadata
+    total_nulls = 0
+    
+    for rg_index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg_index)
+        for col_index in range(row_group.num_columns):
+            column = row_group.column(col_index)
+            stats = column.statistics
+            if stats is not None and stats.has_null_count:
+                total_nulls += stats.null_count
+            else:
+                chunk = parquet_file.read_row_group(rg_index, columns=[column.path_in_schema])
+                total_nulls += chunk.column(0).null_count
+    
+    return total_nulls
+
+def parquet_column_range(parquet_file, column_name):
+    """
+    (min, max) de una columna desde las estadísticas del footer de cada row group,
+    sin leer páginas de datos; None si algún row group no las trae
+    """
+    metadata = parquet_file.metadata
+    column_index = parquet_file.schema_arrow.get_field_index(column_name)
+    column_min = column_max = None
+    
+    for rg_index in range(metadata.num_row_groups):
+        stats = metadata.row_group(rg_index).column(column_index).statistics
+        if stats is None or not stats.has_min_max:
+            return None
+        column_min = stats.min if column_min is None else min(column_min, stats.min)
+        column_max = stats.max if column_max is None else max(column_max, stats.max)
+    
+    return column_min, column_max
+
+def analyze_bronze_file(parquet_path):
+    """
+    Analiza un Parquet de Bronze y devuelve (encontrado, mensajes); los mensajes (nivel, texto)
+    se registran en el hilo principal para no intercalar la salida de varios archivos
+    """
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    
+    if not parquet_path.exists():
+        return False, [(logging.ERROR, f"❌ No encontrado: {parquet_path.name}")]
+    
+    messages = [(logging.INFO, f"\n📄 Analizando: {parquet_path.name}")]
     
     try:
-        # Inicializar convertidor con ruta base del proyecto
-        converter = BronzeConverter(base_path=str(project_root))
-        
-        # Verificar que los CSV estén disponibles
-        csv_files = converter.get_csv_files()
-        if not csv_files:
-            logger.error("❌ No se encontraron archivos CSV.")
-            logger.info("💡 Para obtener los datos, ejecuta desde la raíz del proyecto:")
-            logger.info("   python src/data_flow/download_data.py")
-            return False
-        
-        logger.info(f"📋 Archivos CSV encontrados: {len(csv_files)}")
-        for csv_file in csv_files:
-            logger.info(f"   📄 {csv_file.name}")
-        
-        # Realizar conversión
-        results = converter.convert_all_csv_to_bronze()
-        
-        if not results["success"]:
-            logger.error("❌ Error en la conversión a Bronze")
-            if results.get("errors"):
-                for error in results["errors"]:
-                    logger.error(f"   {error}")
-            return False
-        
-        # Verificar capa Bronze
-        verification_success = converter.verify_bronze_layer()
+        # Esquema y filas desde el footer, sin descomprimir columnas
+        parquet_file = pq.ParquetFile(parquet_path)
+        column_names = parquet_file.schema_arrow.names
         
-        if not verification_success:
-            logger.error("❌ Error en la verificación de Bronze")
-            return False
+        # Verificar esquema
+        missing_columns = sorted(_EXPECTED_COLS.difference(column_names))
         
-        # Mostrar resumen de compresión
-        logger.info("\n💾 RESUMEN DE COMPRESIÓN:")
-        logger.info("-" * 25)
+        if missing_columns:
+            messages.append((logging.ERROR, f"   ❌ Faltan columnas: {missing_columns}"))
+        else:
+            messages.append((logging.INFO, f"   ✅ Esquema correcto ({len(column_names)} columnas)"))
         
-        total_original = results["total_size_original"]
-        total_compressed = results["total_size_compressed"]
-        compression_ratio = (1 - total_compressed / total_original) * 100 if total_original > 0 else 0
-        space_saved = total_original - total_compressed
+        # Verificar datos
+        messages.append((logging.INFO, f"   📊 Filas: {parquet_file.metadata.num_rows:,}"))
         
-        logger.info(f"   Tamaño original (CSV): {converter.format_size(total_original)}")
-        logger.info(f"   Tamaño comprimido: {converter.format_size(total_compressed)}")
-        logger.info(f"   Compresión lograda: {compression_ratio:.1f}%")
-        logger.info(f"   Espacio ahorrado: {converter.format_size(space_saved)}")
+        # Verificar nulos
+        total_nulls = count_parquet_nulls(parquet_file)
+        if total_nulls > 0:
+            messages.append((logging.WARNING, f"   ⚠️ Total nulos: {total_nulls}"))
+        else:
+            messages.append((logging.INFO, f"   ✅ Sin valores nulos"))
+        
+        # Precios y usuarios se recorren por lotes con kernels de Arrow (sin describe() ni
+        # copias filtradas): la memoria pico depende de PARQUET_BATCH_ROWS, no del archivo
+        stream_columns = [col for col in ("price", "user_id") if col in column_names]
+        
+        # Min/max de precios desde el footer; solo se calculan por lote si faltan estadísticas
+        price_range = parquet_column_range(parquet_file, "price") if "price" in column_names else None
+        price_min, price_max = price_range or (None, None)
+        price_sum = 0.0
+        price_count = 0
+        invalid_prices = 0
+        # Con datasketches la cardinalidad es aproximada y la memoria no crece con los usuarios
+        users_sketch = datasketches.hll_sketch(HLL_LG_K) if datasketches is not None else None
+        unique_users = set()
+        
+        if stream_columns:
+            for batch in parquet_file.iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=stream_columns):
+                if "price" in stream_columns:
+                    price = batch.column("price")
+                    if price_range is None:
+                        batch_range = pc.min_max(price)
+                        batch_min, batch_max = batch_range["min"].as_py(), batch_range["max"].as_py()
+                        if batch_min is not None:
+                            price_min = batch_min if price_min is None else min(price_min, batch_min)
+                            price_max = batch_max if price_max is None else max(price_max, batch_max)
+                    price_sum += pc.sum(price).as_py() or 0.0
+                    price_count += pc.count(price).as_py()
+                    invalid_prices += pc.sum(pc.less_equal(price, 0)).as_py() or 0
+                
+                if "user_id" in stream_columns:
+                    batch_users = pc.unique(batch.column("user_id").drop_null()).to_pylist()
+                    if users_sketch is not None:
+                        for user in batch_users:
+                            users_sketch.update(str(user))
+                    else:
+                        unique_users.update(batch_users)
         
-        # Mostrar estadísticas de micro-batches
-        if "micro_batch_stats" in results:
-            stats = results["micro_batch_stats"]
-            logger.info(f"\n⚡ ESTADÍSTICAS DE MICRO-BATCHES:")
-            logger.info(f"   Tamaño de batch: {stats.get('batch_size_used', 'N/A'):,} filas")
-            logger.info(f"   Total batches procesados: {results.get('total_batches', 0):,}")
-            logger.info(f"   Memoria optimizada: {stats.get('memory_optimized', False)}")
+        # Verificar precios
+        if "price" in column_names and price_count > 0:
+            price_mean = price_sum / price_count
+            messages.append((logging.INFO, f"   💰 Precios - Min: ${price_min:.2f}, Max: ${price_max:.2f}, Avg: ${price_mean:.2f}"))
             
-        logger.info("\n🎉 PRUEBA DE CONVERSIÓN A BRONZE COMPLETADA EXITOSAMENTE")
-        return True
-        
+            # Verificar precios inválidos
+            if invalid_prices > 0:
+                messages.append((logging.WARNING, f"   ⚠️ {invalid_prices} precios inválidos (≤ 0)"))
+            else:
+                messages.append((logging.INFO, f"   ✅ Todos los precios son válidos"))
+        
+        # Verificar usuarios únicos (sin contar nulos)
+        if "user_id" in column_names:
+            if users_sketch is not None:
+                messages.append((logging.INFO, f"   👥 Usuarios únicos: ~{int(users_sketch.get_estimate())}"))
+            else:
+                messages.append((logging.INFO, f"   👥 Usuarios únicos: {len(unique_users)}"))
+    
     except Exception as e:
-        logger.error(f"❌ Error inesperado: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return False
+        messages.append((logging.ERROR, f"   ❌ Error leyendo {parquet_path.name}: {e}"))
+    
+    return True, messages
+
+def test_bronze_conversion(converter, csv_files):
+    """
+    Prueba la conversión completa a Bronze
+    """
+    logger.info("🥉 INICIANDO PRUEBA DE CONVERSIÓN A BRONZE")
+    logger.info("=" * 60)
+    
+    # Verificar que los CSV estén disponibles
+    assert csv_files, ("❌ No se encontraron archivos CSV. Para obtener los datos, ejecuta desde la raíz "
+                       "del proyecto: python src/data_flow/download_data.py")
+    
+    logger.info("📋 Archivos CSV encontrados: %s", len(csv_files))
+    for csv_file in csv_files:
+        logger.info("   📄 %s", csv_file.name)
+    
+    # Realizar conversión
+    results = converter.convert_all_csv_to_bronze()
+    assert results["success"], f"❌ Error en la conversión a Bronze: {results.get('errors')}"
+    
+    # Verificar capa Bronze
+    assert converter.verify_bronze_layer(), "❌ Error en la verificación de Bronze"
+    
+    # Mostrar resumen de compresión
+    logger.info("\n💾 RESUMEN DE COMPRESIÓN:")
+    logger.info("-" * 25)
+    
+    total_original = results["total_size_original"]
+    total_compressed = results["total_size_compressed"]
+    compression_ratio = (1 - total_compressed / total_original) * 100 if total_original > 0 else 0
+    space_saved = total_original - total_compressed
+    original_size, compressed_size, saved_size = map(
+        converter.format_size, (total_original, total_compressed, space_saved)
+    )
+    
+    logger.info("   Tamaño original (CSV): %s", original_size)
+    logger.info("   Tamaño comprimido: %s", compressed_size)
+    logger.info("   Compresión lograda: %.1f%%", compression_ratio)
+    logger.info("   Espacio ahorrado: %s", saved_size)
+    
+    # Con zstd y suficiente volumen los Parquet deben ocupar como mucho el 40% del CSV
+    if total_original >= MIN_COMPRESSION_INPUT_BYTES:
+        assert compression_ratio >= MIN_COMPRESSION_RATIO, (
+            f"❌ Compresión insuficiente: {compression_ratio:.1f}% (mínimo {MIN_COMPRESSION_RATIO}%)"
+        )
+    
+    # Mostrar estadísticas de micro-batches
+    if "micro_batch_stats" in results:
+        stats = results["micro_batch_stats"]
+        logger.info("\n⚡ ESTADÍSTICAS DE MICRO-BATCHES:")
+        logger.info("   Tamaño de batch: %s filas", stats.get('batch_size_used', 'N/A'))
+        logger.info("   Total batches procesados: %d", results.get('total_batches', 0))
+        logger.info("   Memoria optimizada: %s", stats.get('memory_optimized', False))
+    
+    logger.info("\n🎉 PRUEBA DE CONVERSIÓN A BRONZE COMPLETADA EXITOSAMENTE")
 
-def test_bronze_data_quality():
+def test_bronze_data_quality(converter):
     """
     Prueba la calidad de los datos en Bronze
     """
     logger.info("\n🔍 PRUEBA DE CALIDAD DE DATOS BRONZE")
     logger.info("=" * 40)
     
-    try:
-        import pandas as pd
-        
-        bronze_path = project_root / "data" / "processed" / "bronze"
-        
-        if not bronze_path.exists():
-            logger.error(f"❌ Directorio Bronze no existe: {bronze_path}")
-            return False
-        
-        expected_files = ["2012-1", "2012-2", "2012-3", "2012-4", "2012-5", "validation"]
-        files_found = 0
-        
-        for file_stem in expected_files:
-            parquet_path = bronze_path / f"{file_stem}.parquet"
-            
-            if not parquet_path.exists():
-                logger.error(f"❌ No encontrado: {parquet_path.name}")
-                continue
-            
-            files_found += 1
-            logger.info(f"\n📄 Analizando: {parquet_path.name}")
-            
-            try:
-                # Leer archivo Parquet
-                df = pd.read_parquet(parquet_path)
-                
-                # Verificar esquema
-                expected_columns = ["timestamp", "price", "user_id", "source_file"]
-                missing_columns = [col for col in expected_columns if col not in df.columns]
-                
-                if missing_columns:
-                    logger.error(f"   ❌ Faltan columnas: {missing_columns}")
-                else:
-                    logger.info(f"   ✅ Esquema correcto ({len(df.columns)} columnas)")
-                
-                # Verificar datos
-                logger.info(f"   📊 Filas: {len(df):,}")
-                
-                # Verificar nulos
-                null_counts = df.isnull().sum()
-                total_nulls = null_counts.sum()
-                if total_nulls > 0:
-                    logger.warning(f"   ⚠️ Total nulos: {total_nulls}")
-                else:
-                    logger.info(f"   ✅ Sin valores nulos")
-                
-                # Verificar precios
-                if "price" in df.columns:
-                    price_stats = df["price"].describe()
-                    logger.info(f"   💰 Precios - Min: ${price_stats['min']:.2f}, Max: ${price_stats['max']:.2f}, Avg: ${price_stats['mean']:.2f}")
-                    
-                    # Verificar precios inválidos
-                    invalid_prices = df[df["price"] <= 0]
-                    if len(invalid_prices) > 0:
-                        logger.warning(f"   ⚠️ {len(invalid_prices)} precios inválidos (≤ 0)")
-                    else:
-                        logger.info(f"   ✅ Todos los precios son válidos")
-                
-                # Verificar usuarios únicos
-                if "user_id" in df.columns:
-                    unique_users = df["user_id"].nunique()
-                    logger.info(f"   👥 Usuarios únicos: {unique_users}")
-                
-            except Exception as e:
-                logger.error(f"   ❌ Error leyendo {parquet_path.name}: {e}")
-        
-        if files_found == 0:
-            logger.error("❌ No se encontraron archivos Parquet en Bronze")
-            return False
-        
-        logger.info(f"\n✅ Prueba de calidad completada - {files_found}/{len(expected_files)} archivos verificados")
-        return True
-        
-    except ImportError:
-        logger.error("❌ pandas no disponible para pruebas de calidad")
-        return False
-    except Exception as e:
-        logger.error(f"❌ Error en prueba de calidad: {e}")
-        return False
+    bronze_path = converter.bronze_path
+    assert bronze_path.exists(), f"❌ Directorio Bronze no existe: {bronze_path}"
+    
+    files_found = 0
+    
+    # PyArrow libera el GIL al decodificar: un hilo por archivo
+    parquet_paths = [bronze_path / f"{file_stem}.parquet" for file_stem in _EXPECTED_STEMS]
+    with ThreadPoolExecutor(max_workers=min(len(parquet_paths), os.cpu_count() or 1)) as executor:
+        results = list(executor.map(analyze_bronze_file, parquet_paths))
+    
+    for found, messages in results:
+        files_found += found
+        for level, message in messages:
+            logger.log(level, message)
+    
+    assert files_found > 0, "❌ No se encontraron archivos Parquet en Bronze"
+    
+    logger.info("\n✅ Prueba de calidad completada - %s/%s archivos verificados", files_found, len(_EXPECTED_STEMS))
 
-def test_memory_compliance():
+def test_memory_compliance(converter, csv_files):
     """
     Prueba específica para verificar cumplimiento de requerimientos de memoria
     """
     logger.info("\n🧠 PRUEBA DE CUMPLIMIENTO DE MEMORIA")
     logger.info("=" * 45)
     
-    try:
-        # Inicializar convertidor
-        converter = BronzeConverter(base_path=str(project_root))
-        
-        # Verificar configuración de micro-batches
-        batch_size = getattr(converter, 'micro_batch_size', 1000)
-        logger.info(f"🔧 Configuración de memoria:")
-        logger.info(f"   Micro-batch size: {batch_size:,} filas")
-        
-        # Verificar que el batch size sea razonable para memoria
-        if batch_size <= 5000:
-            logger.info(f"   ✅ Tamaño de batch apropiado para memoria limitada")
-        else:
-            logger.warning(f"   ⚠️ Tamaño de batch grande: {batch_size:,} filas")
-        
-        # Verificar archivos CSV disponibles
-        csv_files = converter.get_csv_files()
-        if not csv_files:
-            logger.warning("⚠️ No hay archivos CSV para probar memoria")
-            logger.info("   Esta prueba requiere datos descargados")
-            return True  # No falla si no hay datos
-        
-        logger.info(f"📊 Probando cumplimiento con {len(csv_files)} archivos")
-        
-        # Simular procesamiento por micro-batches
-        total_files_would_process = 0
-        estimated_max_memory_mb = 0
-        
-        for csv_file in csv_files:
-            try:
-                # Estimar filas sin cargar archivo completo
-                with open(csv_file, 'r') as f:
-                    # Contar líneas de forma eficiente
-                    line_count = sum(1 for _ in f) - 1  # -1 por header
-                
-                # Calcular batches necesarios
-                batches_needed = (line_count + batch_size - 1) // batch_size
-                
-                # Estimar memoria por batch (aprox 50-100 bytes por fila)
-                estimated_batch_memory_mb = (batch_size * 100) / 1024 / 1024
-                estimated_max_memory_mb = max(estimated_max_memory_mb, estimated_batch_memory_mb)
-                
-                logger.info(f"   📄 {csv_file.name}: {line_count:,} filas → {batches_needed} batches")
-                total_files_would_process += 1
-                
-            except Exception as e:
-                logger.warning(f"   ⚠️ Error estimando {csv_file.name}: {e}")
-        
-        logger.info(f"\n📊 ESTIMACIÓN DE MEMORIA:")
-        logger.info(f"   Archivos a procesar: {total_files_would_process}")
-        logger.info(f"   Memoria máxima estimada: {estimated_max_memory_mb:.2f} MB por batch")
-        logger.info(f"   Memoria total estimada: < {estimated_max_memory_mb * 2:.2f} MB")
-        
-        # Verificaciones de cumplimiento
-        compliance_checks = {
-            "batch_size_razonable": batch_size <= 5000,
-            "memoria_estimada_baja": estimated_max_memory_mb < 50,  # Menos de 50MB por batch
-            "archivos_procesados_secuencialmente": True,  # Por diseño
-        }
-        
-        logger.info(f"\n✅ VERIFICACIONES DE CUMPLIMIENTO:")
-        all_passed = True
-        for check, passed in compliance_checks.items():
-            status = "✅ PASA" if passed else "❌ FALLA"
-            logger.info(f"   {check}: {status}")
-            if not passed:
-                all_passed = False
-        
-        if all_passed:
-            logger.info(f"\n🎉 CUMPLIMIENTO DE MEMORIA VERIFICADO")
-            logger.info(f"   ✅ Micro-batch size: {batch_size:,} filas")
-            logger.info(f"   ✅ Memoria estimada controlada: < {estimated_max_memory_mb:.1f} MB")
-            logger.info(f"   ✅ Procesamiento secuencial: Un archivo a la vez")
-            logger.info(f"   ✅ Sin carga completa de archivos CSV en memoria")
-            return True
-        else:
-            logger.error(f"❌ Algunas verificaciones de cumplimiento fallaron")
-            return False
-        
-    except Exception as e:
-        logger.error(f"❌ Error en prueba de memoria: {e}")
-        return False
-
-def main():
-    """
-    Función principal para ejecutar todas las pruebas
-    """
-    logger.info(f"🧪 INICIANDO SUITE DE PRUEBAS BRONZE")
-    logger.info(f"📁 Directorio de trabajo: {Path.cwd()}")
-    logger.info(f"📁 Proyecto detectado: {project_root}")
-    logger.info("=" * 60)
+    # Verificar configuración de micro-batches
+    batch_size = getattr(converter, 'micro_batch_size', 1000)
+    logger.info("🔧 Configuración de memoria:")
+    logger.info("   Micro-batch size: %d filas", batch_size)
     
-    try:
-        tests_passed = 0
-        total_tests = 3
-        
-        # Prueba 1: Conversión
-        logger.info(f"\n🧪 PRUEBA 1/3: Conversión a Bronze")
-        if test_bronze_conversion():
-            tests_passed += 1
-            logger.info("✅ Prueba 1 PASÓ")
-        else:
-            logger.error("❌ Prueba 1 FALLÓ")
-        
-        # Prueba 2: Calidad de datos
-        logger.info(f"\n🧪 PRUEBA 2/3: Calidad de datos")
-        if test_bronze_data_quality():
-            tests_passed += 1
-            logger.info("✅ Prueba 2 PASÓ")
-        else:
-            logger.error("❌ Prueba 2 FALLÓ")
-        
-        # Prueba 3: Cumplimiento de memoria
-        logger.info(f"\n🧪 PRUEBA 3/3: Cumplimiento de memoria")
-        if test_memory_compliance():
-            tests_passed += 1
-            logger.info("✅ Prueba 3 PASÓ")
-        else:
-            logger.error("❌ Prueba 3 FALLÓ")
-        
-        # Resumen final
-        logger.info(f"\n🎯 RESUMEN FINAL: {tests_passed}/{total_tests} pruebas pasaron")
-        
-        if tests_passed == total_tests:
-            logger.info("🎉 TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+    # Verificar que el batch size sea razonable para memoria
+    if batch_size <= 5000:
+        logger.info("   ✅ Tamaño de batch apropiado para memoria limitada")
+    else:
+        logger.warning("   ⚠️ Tamaño de batch grande: %d filas", batch_size)
+    
+    # Esta prueba requiere datos descargados; no falla si no hay
+    if not csv_files:
+        pytest.skip("⚠️ No hay archivos CSV para probar memoria")
+    
+    logger.info("📊 Probando cumplimiento con %s archivos", len(csv_files))
+    
+    # Simular procesamiento por micro-batches
+    total_files_would_process = 0
+    estimated_max_memory_mb = 0
+    
+    # Si el Parquet de Bronze ya existe sus filas salen del footer; solo los CSV
+    # sin convertir se cuentan, en paralelo y sin cargar ningún archivo completo
+    import pyarrow.parquet as pq
+    
+    pending_csv = [csv_file for csv_file in csv_files
+                   if not (converter.bronze_path / f"{csv_file.stem}.parquet").exists()]
+    row_counts = {}
+    if pending_csv:
+        with ProcessPoolExecutor(max_workers=min(len(pending_csv), os.cpu_count() or 1)) as executor:
+            row_counts = {csv_file: executor.submit(count_csv_rows, csv_file) for csv_file in pending_csv}
+    
+    for csv_file in csv_files:
+        try:
+            if csv_file in row_counts:
+                line_count = row_counts[csv_file].result()
+            else:
+                parquet_path = converter.bronze_path / f"{csv_file.stem}.parquet"
+                line_count = pq.ParquetFile(parquet_path).metadata.num_rows
             
-            # Mostrar cumplimiento del reto
-            logger.info("\n✅ CUMPLIMIENTO DEL RETO VERIFICADO:")
-            logger.info("   ✅ Descarga automatizada desde Google Drive")
-            logger.info("   ✅ Conversión CSV → Parquet con compresión")
-            logger.info("   ✅ Micro-batches (NO carga archivos completos)")
-            logger.info("   ✅ Procesamiento secuencial (UN archivo a la vez)")
-            logger.info("   ✅ Memoria optimizada y liberada entre batches")
-            logger.info("   ✅ Validaciones de calidad automáticas")
-            logger.info("   ✅ Arquitectura Medallion (Bronze completado)")
+            # Calcular batches necesarios
+            batches_needed = (line_count + batch_size - 1) // batch_size
             
-            return 0
-        else:
-            logger.error("❌ Algunas pruebas fallaron")
-            return 1
-        
-    except Exception as e:
-        logger.error(f"❌ Error inesperado en suite de pruebas: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return 1
-
-if __name__ == "__main__":
-    exit_code = main()
-    sys.exit(exit_code)
\ No newline at end of file
+            # Estimar memoria por batch (aprox 50-100 bytes por fila)
+            estimated_batch_memory_mb = (batch_size * 100) / 1024 / 1024
+            estimated_max_memory_mb = max(estimated_max_memory_mb, estimated_batch_memory_mb)
+            
+            logger.info("   📄 %s: %d filas → %s batches", csv_file.name, line_count, batches_needed)
+            total_files_would_process += 1
+            
+        except Exception as e:
+            logger.warning("   ⚠️ Error estimando %s: %s", csv_file.name, e)
+    
+    logger.info("\n📊 ESTIMACIÓN DE MEMORIA:")
+    logger.info("   Archivos a procesar: %s", total_files_would_process)
+    logger.info("   Memoria máxima estimada: %.2f MB por batch", estimated_max_memory_mb)
+    logger.info("   Memoria total estimada: < %.2f MB", estimated_max_memory_mb * 2)
+    
+    # Verificaciones de cumplimiento
+    compliance_checks = {
+        "batch_size_razonable": batch_size <= 5000,
+        "memoria_estimada_baja": estimated_max_memory_mb < 50,  # Menos de 50MB por batch
+        "archivos_procesados_secuencialmente": True,  # Por diseño
+    }
+    
+    logger.info("\n✅ VERIFICACIONES DE CUMPLIMIENTO:")
+    for check, passed in compliance_checks.items():
+        status = "✅ PASA" if passed else "❌ FALLA"
+        logger.info("   %s: %s", check, status)
+    
+    failed_checks = [check for check, passed in compliance_checks.items() if not passed]
+    assert not failed_checks, f"❌ Algunas verificaciones de cumplimiento fallaron: {failed_checks}"
+    
+    logger.info("\n🎉 CUMPLIMIENTO DE MEMORIA VERIFICADO")
+    logger.info("   ✅ Micro-batch size: %d filas", batch_size)
+    logger.info("   ✅ Memoria estimada controlada: < %.1f MB", estimated_max_memory_mb)
+    logger.info("   ✅ Procesamiento secuencial: Un archivo a la vez")
+    logger.info("   ✅ Sin carga completa de archivos CSV en memoria")
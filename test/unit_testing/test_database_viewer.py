@@ -0,0 +1,28 @@
+# test/unit_testing/test_database_viewer.py
+"""
+Pruebas de render de la página Visor de Base de Datos (streamlit AppTest)
+"""
+
+from pathlib import Path
+
+import pytest
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+# El archivo vive en <raíz>/test/unit_testing/, la raíz está dos niveles arriba
+project_root = Path(__file__).resolve().parents[2]
+PAGE_PATH = project_root / "streamlit-app" / "pages" / "05_🗄️_database_viewer.py"
+DB_PATH = project_root / "data" / "pipeline.db"
+
+
+@pytest.mark.skipif(not DB_PATH.exists(), reason="Requiere data/pipeline.db (ejecuta el pipeline primero)")
+def test_database_viewer_explorer_and_schema_tabs():
+    """Las pestañas Explorador y Esquema se renderizan sin errores sobre la conexión con authorizer"""
+    app = AppTest.from_file(str(PAGE_PATH), default_timeout=60).run()
+
+    assert not app.exception, [exception.value for exception in app.exception]
+    errors = [error.value for error in app.error]
+    assert not errors, errors
+
+    # Esquema: un expander por tabla de la BD
+    assert any(expander.label.startswith("📊 Tabla:") for expander in app.expander)